@@ -1,26 +1,203 @@
+import argparse
+import glob
+import json
+import os
 import subprocess
+import sys
+import time
 
-def run_behave_tests():
-    """Run Behave tests."""
+from behave.parser import parse_file
+
+from config.test_config import TestConfig
+from formatters.html_formatter import write_json_report
+from utils.data_generator import DataGenerator
+from utils.worker import WORKER_INDEX_ENV, WORKER_COUNT_ENV
+
+HOST = "http://127.0.0.1:5000"
+CAPACITY_SHAPE = "locust_scenarios/capacity_search.py"
+
+
+def run_behave_tests(workers=TestConfig.BEHAVE_WORKERS):
+    """Run Behave tests, split across ``workers`` processes when more than one."""
+    if (workers or os.cpu_count() or 1) > 1:
+        return run_behave_parallel(workers)
     result = subprocess.run(["behave"], capture_output=True, text=True)
     print("Behave Output:\n", result.stdout)
     print("Behave Error:\n", result.stderr)  # Print stderr for detailed error messages
     if result.returncode != 0:
         raise Exception("Behave tests failed!")
 
-def run_locust():
-    """Run Locust tests."""
-    subprocess.run([
-        "locust",
-        "-f", "locustfile.py",
-        "--host", "http://127.0.0.1:5000",
-        "--users", "10",
-        "--spawn-rate", "1",
-        "--run-time", "1m",
-        "--csv", "test_results",
-        "--html", "test_report.html"
+
+def _scenario_locations(features_dir="features"):
+    """Return "file:line" for every scenario, with Scenario Outline examples expanded.
+
+    ``@scale`` scenarios are left out, as in a plain ``behave`` run (see behave.ini).
+    """
+    locations = []
+    for path in sorted(glob.glob(os.path.join(features_dir, "**", "*.feature"), recursive=True)):
+        feature = parse_file(path)
+        locations.extend(f"{path}:{scenario.line}" for scenario in feature.walk_scenarios()
+                         if "scale" not in scenario.effective_tags)
+    return locations
+
+
+def _merge_features(json_paths):
+    # Workers each report a subset of every feature; regroup scenarios per feature file
+    features = {}
+    for path in json_paths:
+        if not os.path.exists(path) or not os.path.getsize(path):
+            continue
+        with open(path) as f:
+            for feature in json.load(f):
+                merged = features.setdefault(feature["location"].split(":")[0], {**feature, "elements": []})
+                merged["elements"].extend(feature.get("elements", []))
+    for feature in features.values():
+        feature["elements"].sort(key=lambda element: int(element["location"].split(":")[-1]))
+    return [features[key] for key in sorted(features)]
+
+
+def run_behave_parallel(workers=None, report_name="behave_report.html"):
+    """Run the behave scenarios split round-robin over a pool of behave processes.
+
+    Each worker gets its own BEHAVE_DATA_NAMESPACE so registered users never
+    collide, writes JSON results and a log under reports/behave/, and the
+    results are merged into one HTML report and one pass/fail outcome.
+    """
+    locations = _scenario_locations()
+    workers = min(workers or os.cpu_count() or 1, len(locations)) or 1
+    output_dir = os.path.join(TestConfig.REPORTS_DIR, "behave")
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.time()
+
+    processes = []
+    for index in range(workers):
+        json_path = os.path.join(output_dir, f"worker_{index}.json")
+        log = open(os.path.join(output_dir, f"worker_{index}.log"), "w")
+        command = [sys.executable, "-m", "behave", "--no-skipped", "-f", "json", "-o", json_path, "-f", "progress",
+                   *locations[index::workers]]
+        env = {**os.environ, "BEHAVE_DATA_NAMESPACE": f"w{index}"}
+        processes.append((subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, env=env), log, json_path))
+
+    failed = []
+    for index, (process, log, _) in enumerate(processes):
+        if process.wait() != 0:
+            failed.append(index)
+        log.close()
+
+    report_path = os.path.join(TestConfig.REPORTS_DIR, report_name)
+    with open(report_path, "w") as stream:
+        counts = write_json_report(_merge_features(path for _, _, path in processes), stream,
+                                   time.time() - started)
+    print(f"Behave: {counts['passed']} passed, {counts['failed']} failed, {counts['skipped']} skipped "
+          f"across {workers} workers in {time.time() - started:.2f}s, report: {report_path}")
+    if failed:
+        raise Exception(f"Behave tests failed! See {output_dir}/worker_{{{','.join(map(str, failed))}}}.log")
+
+
+def _prepare_locust_data():
+    # Fresh pool per run: records are claimed once, and a new namespace avoids
+    # colliding with users registered by earlier runs
+    DataGenerator().build_user_pool(TestConfig.USER_POOL_PATH, TestConfig.USER_POOL_SIZE)
+    if os.path.exists(TestConfig.CREDENTIAL_STORE_PATH):
+        os.remove(TestConfig.CREDENTIAL_STORE_PATH)
+
+
+def _stop(processes, timeout=10):
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    deadline = time.time() + timeout
+    for process in processes:
+        try:
+            process.wait(max(deadline - time.time(), 0))
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def run_locust(users=TestConfig.CONCURRENT_USERS, spawn_rate=TestConfig.SPAWN_RATE, run_time="1m",
+               workers=TestConfig.LOCUST_WORKERS, locustfile="locustfile.py", host=HOST,
+               csv_prefix="test_results", html_report="test_report.html", extra_args=()):
+    """Run Locust tests as a master plus ``workers`` worker processes (default: one per core).
+
+    The master waits for every worker to connect and spreads users evenly over
+    them; the run is aborted as soon as any worker dies. CSV and HTML reports
+    are written to ``TestConfig.REPORTS_DIR``. Returns the master's exit code.
+    Pass ``users``, ``spawn_rate`` and ``run_time`` as None when a load shape
+    in the locustfile drives the run.
+    """
+    _prepare_locust_data()
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(TestConfig.REPORTS_DIR, exist_ok=True)
+    common = ["locust", "-f", locustfile]
+    run_args = ["--headless", "--host", host]
+    for flag, value in (("--users", users), ("--spawn-rate", spawn_rate), ("--run-time", run_time)):
+        if value is not None:
+            run_args += [flag, str(value)]
+    run_args += [
+        "--csv", os.path.join(TestConfig.REPORTS_DIR, csv_prefix),
+        "--html", os.path.join(TestConfig.REPORTS_DIR, html_report),
+        *extra_args,
+    ]
+
+    if workers == 1:
+        return subprocess.run(common + run_args).returncode
+
+    port = str(TestConfig.LOCUST_MASTER_PORT)
+    master = subprocess.Popen(common + run_args + [
+        "--master",
+        "--master-bind-port", port,
+        "--expect-workers", str(workers),
+        "--expect-workers-max-wait", str(TestConfig.WORKER_CONNECT_TIMEOUT),
     ])
+    worker_processes = [
+        subprocess.Popen(
+            common + ["--worker", "--master-host", "127.0.0.1", "--master-port", port],
+            env={**os.environ, WORKER_INDEX_ENV: str(index), WORKER_COUNT_ENV: str(workers)},
+        )
+        for index in range(workers)
+    ]
+    print(f"Started Locust master and {workers} workers")
+
+    try:
+        while master.poll() is None:
+            for index, worker in enumerate(worker_processes):
+                code = worker.poll()
+                if code is not None and code != 0:
+                    raise Exception(f"Locust worker {index} exited with code {code}, aborting run")
+            time.sleep(0.5)
+    finally:
+        _stop([master] + worker_processes)
+    return master.returncode
+
+
+def run_capacity_search(workers=TestConfig.LOCUST_WORKERS, locustfile="locustfile.py"):
+    """Step the user count of ``locustfile`` until the SLOs break and report the maximum.
+
+    The curve and the result are written to ``capacity_curve.csv`` and
+    ``capacity_summary.json`` in ``TestConfig.REPORTS_DIR``.
+    """
+    return run_locust(None, None, None, workers, f"{locustfile},{CAPACITY_SHAPE}",
+                      csv_prefix="capacity", html_report="capacity_report.html")
+
 
 if __name__ == "__main__":
-    run_behave_tests()  # Run functional tests first
-    run_locust()        # If successful, run performance tests
+    parser = argparse.ArgumentParser(description="Run the behave suite, then the Locust load test")
+    parser.add_argument("--workers", type=int, default=TestConfig.LOCUST_WORKERS,
+                        help="Locust worker processes (default: one per CPU core)")
+    parser.add_argument("--users", type=int, default=TestConfig.CONCURRENT_USERS)
+    parser.add_argument("--spawn-rate", type=float, default=TestConfig.SPAWN_RATE)
+    parser.add_argument("--run-time", default="1m")
+    parser.add_argument("--locustfile", default="locustfile.py")
+    parser.add_argument("--skip-behave", action="store_true")
+    parser.add_argument("--capacity-search", action="store_true",
+                        help="Search for the highest load that meets the SLOs instead of a fixed-size run")
+    parser.add_argument("--behave-workers", type=int, default=TestConfig.BEHAVE_WORKERS,
+                        help="Parallel behave processes (default: one per CPU core, 1 runs serially)")
+    args = parser.parse_args()
+
+    if not args.skip_behave:
+        run_behave_tests(args.behave_workers)  # Run functional tests first
+    # If successful, run performance tests
+    if args.capacity_search:
+        sys.exit(run_capacity_search(args.workers, args.locustfile))
+    sys.exit(run_locust(args.users, args.spawn_rate, args.run_time, args.workers, args.locustfile))
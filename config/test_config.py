@@ -1,3 +1,8 @@
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
 class TestConfig:
     BASE_URL = "http://127.0.0.1:5000/"
     CONCURRENT_USERS = 10
@@ -9,7 +14,105 @@ class TestConfig:
     MAX_WAIT_TIME = 3000  # milliseconds
     WAIT_TIME_MIN = 1
     WAIT_TIME_MAX = 2
+    REPORTS_DIR = os.path.join(PROJECT_ROOT, "reports")
+    JWT_SECRET = "123456"  # Same as in the application
+    # Parallel behave processes: None starts one per CPU core, 1 runs serially
+    BEHAVE_WORKERS = None
+    # Users already registered on BASE_URL, reused by behave steps that only need an existing account
+    FIXTURE_STORE = True
+    FIXTURE_STORE_PATH = os.path.join(REPORTS_DIR, "fixture_users.sqlite")
+    # Requests in flight at once in the behave concurrency steps (features/steps/async_client.py)
+    BEHAVE_CONCURRENCY = 500
+    # Distributed runs: None starts one worker per CPU core
+    LOCUST_WORKERS = None
+    LOCUST_MASTER_PORT = 5557
+    WORKER_CONNECT_TIMEOUT = 30  # seconds
     # Registration test configs
     REGISTRATION_ENDPOINT = "/client_registeration"
+    # Pre-generated user pool (python -m utils.data_generator); Faker is used when missing
+    USER_POOL_PATH = os.path.join(REPORTS_DIR, "user_pool.bin")
+    USER_POOL_SIZE = 100000
+    # Bounded ring of registered credentials shared by all Locust processes on a node
+    CREDENTIAL_STORE_PATH = os.path.join(REPORTS_DIR, "credentials.bin")
+    CREDENTIAL_STORE_CAPACITY = 10000
+    # Burst tasks: identical requests released together, at most once per BURST_INTERVAL seconds per user
+    BURST_SIZE = 3
+    BURST_INTERVAL = 0
+    # Open-model runs (locust_scenarios/open_model_test.py): total requests/second per endpoint,
+    # and how many times the Little's-law user count (rate x MAX_RESPONSE_TIME) to run
+    ARRIVAL_RATES = {"registration": 10, "login": 40}
+    ARRIVAL_HEADROOM = 2
+    # Ramp/steady-state split (opt-in, it resets Locust's stats mid-run): after all users are spawned
+    # and WARMUP_SECONDS have passed, stats are reset once throughput and p95 have been stable for
+    # STEADY_STATE_WINDOW seconds (or after STEADY_STATE_TIMEOUT more seconds; 0 splits at exactly WARMUP_SECONDS)
+    STEADY_STATE_SPLIT = False
+    WARMUP_SECONDS = 0
+    STEADY_STATE_WINDOW = 10
+    STEADY_STATE_TIMEOUT = 60
+    # SLO watchdog (opt-in): stop the run with SLO_EXIT_CODE once the last SLO_WINDOW seconds have broken
+    # MAX_RESPONSE_TIME (p95) or SUCCESS_RATE_THRESHOLD for SLO_BREACH_SECONDS in a row
+    SLO_WATCHDOG = False
+    SLO_WINDOW = 10  # seconds
+    SLO_BREACH_SECONDS = 5
+    SLO_MIN_REQUESTS = 20  # smaller windows are not judged
+    SLO_EXIT_CODE = 3
+    # Time DNS/connect/TLS/write/TTFB/download per request in the locust_scenarios users and send an
+    # X-Request-ID header; per-endpoint phase histograms go to reports/phase_timing_<worker>.json
+    PHASE_TIMING = False
+    # Record every request as a fixed-width sample (python -m utils.sample_analyzer reports/samples)
+    SAMPLE_LOG = False
+    SAMPLE_LOG_DIR = os.path.join(REPORTS_DIR, "samples")
+    # Record/replay (locust_scenarios/replay_test.py): REPLAY_RECORD captures the requests of any
+    # scenario but the replay itself; REPLAY_SPEED scales the recorded timing, 0 replays as fast as possible
+    REPLAY_CAPTURE_PATH = os.path.join(REPORTS_DIR, "capture.jsonl")
+    REPLAY_RECORD = False
+    REPLAY_SPEED = 1.0
+    # Run comparison (python -m utils.compare_runs): bootstrap settings, and how much worse a metric may
+    # get (percent, or percentage points for the error rate) before a significant change is a regression
+    COMPARE_RESAMPLES = 1000
+    COMPARE_CONFIDENCE = 95
+    COMPARE_MAX_SAMPLES = 20000  # per endpoint and metric; larger inputs are subsampled
+    COMPARE_TOLERANCE = 5
+    COMPARE_ERROR_RATE_TOLERANCE = 1
+    # Load generator self-monitoring: every Locust process samples its CPU, RSS and gevent loop lag each
+    # CLIENT_MONITOR_INTERVAL seconds (reports/<prefix>_client_stats_history.csv). Staying over CLIENT_MAX_CPU
+    # or CLIENT_MAX_LOOP_LAG_MS for CLIENT_SATURATION_SECONDS marks the results suspect: the HTML report gets a
+    # banner, reports/client_monitor.json says why, and Locust exits with CLIENT_SUSPECT_EXIT_CODE
+    CLIENT_MONITOR = True
+    CLIENT_MONITOR_INTERVAL = 1  # seconds
+    CLIENT_MAX_CPU = 90  # percent of one core
+    CLIENT_MAX_LOOP_LAG_MS = 50
+    CLIENT_SATURATION_SECONDS = 5
+    CLIENT_SUSPECT_EXIT_CODE = 4
+    # Opt-in for memory benchmarks and high-concurrency profiles: simulated users of one process share a
+    # keep-alive connection pool (utils/connection_pool.py) instead of each holding its own, like real clients
+    SHARED_CONNECTIONS = False
+    CONNECTION_POOL_SIZE = 1000  # connections per host; above what one process keeps in flight
+    # python -m utils.memory_benchmark fails when a simulated user costs more RSS than this
+    USER_MEMORY_BUDGET_KB = 40
+    # Live metrics per worker: "prometheus" serves http://METRICS_HOST:(METRICS_PORT + worker index)/metrics,
+    # "statsd" pushes to STATSD_HOST:STATSD_PORT every METRICS_INTERVAL seconds; None turns the exporter off
+    METRICS_EXPORTER = None
+    METRICS_HOST = "127.0.0.1"
+    METRICS_PORT = 9646
+    STATSD_HOST = "127.0.0.1"
+    STATSD_PORT = 8125
+    METRICS_INTERVAL = 10  # seconds; also the window of the requests/second rate
+    METRICS_PREFIX = "locust"
+    # Verify login tokens (signature, expiry, user claims) in a background thread pool; a full queue
+    # drops tokens rather than slowing users down, and bad tokens are reported as "JWT" failures
+    TOKEN_VERIFICATION = False
+    TOKEN_VERIFY_QUEUE = 10000
+    TOKEN_VERIFY_BATCH = 256
+    TOKEN_CACHE_SIZE = 4096
+    # Capacity search (behave_runner.py --capacity-search): users grow by STEP_FACTOR until
+    # the SLOs above break, then bisect until the gap is within RESOLUTION (fraction of users)
+    CAPACITY_START_USERS = 5
+    CAPACITY_STEP_FACTOR = 2
+    CAPACITY_RESOLUTION = 0.1
+    CAPACITY_MAX_USERS = 2000
+    CAPACITY_STEADY_WINDOW = 10  # seconds of stable throughput/latency before a level is judged
+    CAPACITY_MIN_HOLD = 15  # seconds
+    CAPACITY_MAX_HOLD = 60  # seconds
     # Login test configs
     LOGIN_ENDPOINT = "/client_login"
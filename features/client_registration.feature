@@ -21,25 +21,25 @@ Feature: Client Registration and Authentication
     Then I should receive an authentication error
 
   @concurrent
-  Scenario: Small batch registration and login test
+  Scenario: Small batch login test
     Given there are "5" registered users
     When all users attempt to login simultaneously
     Then login requests should complete successfully
 
   @concurrent
-  Scenario: Medium batch registration and login test
+  Scenario: Medium batch login test
     Given there are "20" registered users
     When all users attempt to login simultaneously
     Then login requests should complete successfully
 
   @concurrent @performance
-  Scenario: Large batch registration and login test
+  Scenario: Large batch login test
     Given there are "50" registered users
     When all users attempt to login simultaneously
     Then login requests should complete successfully
 
   @performance
-  Scenario Outline: Batch registration performance test
+  Scenario Outline: Batch login performance test
     Given there are "<user_count>" registered users
     When all users attempt to login simultaneously
     Then login requests should complete successfully
@@ -51,6 +51,18 @@ Feature: Client Registration and Authentication
       | 75        |
       | 100       |
 
+  # Not part of the default run (behave.ini excludes @scale); run with: behave --tags=@scale
+  @scale
+  Scenario Outline: Large batch login scale test
+    Given there are "<user_count>" registered users
+    When all users attempt to login simultaneously
+    Then login requests should complete successfully
+
+    Examples:
+      | user_count |
+      | 1000      |
+      | 5000      |
+
   @security
   Scenario: Verify JWT token content after registration
     Given I am a newly registered user
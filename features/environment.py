@@ -12,12 +12,12 @@ def before_feature(context, feature):
     feature.start_time = datetime.datetime.now()
 
 def after_feature(context, feature):
+    # behave computes feature.duration itself (read-only property)
     feature.end_time = datetime.datetime.now()
-    feature.duration = feature.end_time - feature.start_time
 
 def before_scenario(context, scenario):
     scenario.start_time = datetime.datetime.now()
 
 def after_scenario(context, scenario):
-    scenario.end_time = datetime.datetime.now()
-    scenario.duration = scenario.end_time - scenario.start_time
\ No newline at end of file
+    # behave computes scenario.duration itself (read-only property)
+    scenario.end_time = datetime.datetime.now()
\ No newline at end of file
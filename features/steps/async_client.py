@@ -0,0 +1,84 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlencode
+
+import aiohttp
+
+from config.test_config import TestConfig
+from features.steps.common_steps import BASE_URL, HEADERS
+from utils.histogram import LatencyHistogram
+
+
+class AsyncResponse:
+    """Fully read response exposing the parts of ``requests.Response`` the steps use."""
+
+    __slots__ = ("status_code", "text")
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class BatchResult:
+    """Outcome of one simultaneous batch.
+
+    ``responses``, ``latencies`` (seconds) and ``errors`` line up with the
+    payloads; a request that raised has a None response and its exception in
+    ``errors``. ``histogram`` holds every request's latency in ms.
+    """
+
+    def __init__(self, size):
+        self.responses = [None] * size
+        self.latencies = [0.0] * size
+        self.errors = [None] * size
+        self.histogram = LatencyHistogram()
+        self.duration = 0.0
+
+    def summary(self):
+        p = self.histogram.percentiles((50, 95, 99))
+        return (f"{self.histogram.count} requests in {self.duration:.2f}s, "
+                f"mean {self.histogram.mean():.1f} ms, p50 {p[50]:.1f} ms, p95 {p[95]:.1f} ms, "
+                f"p99 {p[99]:.1f} ms, max {self.histogram.percentile(100):.1f} ms")
+
+
+async def _run_batch(path, payloads, concurrency, base_url):
+    result = BatchResult(len(payloads))
+    release = asyncio.Event()
+    slots = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(base_url.rstrip("/"), connector=connector, headers=HEADERS) as session:
+        async def send(index, body):
+            await release.wait()
+            async with slots:
+                start = time.perf_counter()
+                try:
+                    async with session.post(path, data=body) as response:
+                        result.responses[index] = AsyncResponse(response.status, await response.text())
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    result.errors[index] = e
+                elapsed = time.perf_counter() - start
+            result.latencies[index] = elapsed
+            result.histogram.record(elapsed * 1000)
+
+        # Encode everything and park every task on the barrier before the first request goes out
+        tasks = [asyncio.create_task(send(i, urlencode(payload))) for i, payload in enumerate(payloads)]
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        release.set()
+        await asyncio.gather(*tasks)
+        result.duration = time.perf_counter() - started
+    return result
+
+
+def post_simultaneously(path, payloads, concurrency=TestConfig.BEHAVE_CONCURRENCY, base_url=BASE_URL):
+    """POST every payload to ``path`` at once from one event loop and return a :class:`BatchResult`.
+
+    All requests share one keep-alive pool and are released together by a
+    start barrier; at most ``concurrency`` are in flight, the rest queue.
+    """
+    return asyncio.run(_run_batch(path, list(payloads), concurrency, base_url))
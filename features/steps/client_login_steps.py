@@ -1,36 +1,33 @@
 from behave import given, when, then
-import requests
 from faker import Faker
 import jwt
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from config.test_config import TestConfig
+from features.steps import common_steps
+from features.steps.async_client import post_simultaneously
+from features.steps.fixtures import registered_users, remember_users
+
 fake = Faker()
-BASE_URL = "http://127.0.0.1:5000"
 
 
 class DataGenerator:
     @staticmethod
     def generate_user_data():
-        return {
+        return common_steps.namespaced({
             "fullName": fake.name(),
             "userName": fake.user_name(),
             "email": fake.email(),
             "password": fake.password(length=12),
             "phone": fake.phone_number()
-        }
+        })
 
 
 class LoginClient:
     @staticmethod
     def register_user(user_data):
-        response = requests.post(
-            f"{BASE_URL}/client_registeration",
-            data=user_data,
-            headers={"Content-Type": "application/x-www-form-urlencoded"}
-        )
-        return response
+        return common_steps.register_user(user_data)
 
     @staticmethod
     def login_user(user_data, use_email=True):
@@ -39,40 +36,23 @@ class LoginClient:
             'email': user_data['email'] if use_email else '',
             'password': user_data['password']
         }
-        response = requests.post(
-            f"{BASE_URL}/client_login",
-            data=login_data,
-            headers={"Content-Type": "application/x-www-form-urlencoded"}
-        )
-        return response
+        return common_steps.login_user(login_data)
 
     @staticmethod
-    def perform_concurrent_logins(users, max_workers=10):
+    def perform_concurrent_logins(users, concurrency=TestConfig.BEHAVE_CONCURRENCY):
         """
-        Perform concurrent login attempts for multiple users
-        Returns: List of (user_data, response, duration) tuples
+        Log all users in simultaneously from one asyncio event loop
+        Returns: (list of (user_data, response, duration) tuples, BatchResult)
         """
-        results = []
-        with ThreadPoolExecutor(max_workers=min(len(users), max_workers)) as executor:
-            future_to_user = {}
-            start_times = {}
-
-            for user_data in users:
-                future = executor.submit(LoginClient.login_user, user_data)
-                future_to_user[future] = user_data
-                start_times[future] = time.time()
-
-            for future in as_completed(future_to_user):
-                user_data = future_to_user[future]
-                duration = time.time() - start_times[future]
-                try:
-                    response = future.result()
-                    results.append((user_data, response, duration))
-                except Exception as e:
-                    print(f"Login failed for user {user_data['email']}: {str(e)}")
-                    results.append((user_data, None, duration))
-
-        return results
+        batch = post_simultaneously(
+            common_steps.LOGIN_ENDPOINT,
+            ({'userName': '', 'email': user['email'], 'password': user['password']} for user in users),
+            concurrency,
+        )
+        for user_data, error in zip(users, batch.errors):
+            if error is not None:
+                print(f"Login failed for user {user_data['email']}: {str(error)}")
+        return list(zip(users, batch.responses, batch.latencies)), batch
 
 
 @given("I have a registered user with valid credentials")
@@ -83,28 +63,31 @@ def step_impl(context):
 
     context.response = LoginClient.register_user(context.registration_payload)
     print("Registration response:", context.response.text)
+    if context.response.json().get('msg') == 'User Registered':
+        remember_users([context.registration_payload])
 
 
 @given('I am a registered user')
 def register_test_user(context):
-    context.user_data = DataGenerator.generate_user_data()
-    response = LoginClient.register_user(context.user_data)
-    assert response.json()['msg'] == 'User Registered'
+    context.user_data = registered_users(1)[0]
 
 
 @when('I send a POST request to "/client_login" with the valid credentials')
 def login_with_credentials(context):
+    context.login_data = context.credentials
     context.response = LoginClient.login_user(context.credentials)
     print("Login response:", context.response.text)
 
 
 @when('I login with valid email')
 def login_with_email(context):
+    context.login_data = context.user_data
     context.response = LoginClient.login_user(context.user_data, use_email=True)
 
 
 @when('I login with valid username')
 def login_with_username(context):
+    context.login_data = context.user_data
     context.response = LoginClient.login_user(context.user_data, use_email=False)
 
 
@@ -128,7 +111,8 @@ def verify_jwt_token_and_contents(context):
     # Verify token contents
     secret = '123456'
     decoded = jwt.decode(context.token, secret, algorithms=['HS256'])
-    user_info = context.user_data if hasattr(context, 'user_data') else context.credentials
+    # The user this scenario logged in as, not necessarily the Background's user
+    user_info = context.login_data
 
     assert decoded['email'] == user_info['email']
     assert decoded['userName'] == user_info['userName']
@@ -139,33 +123,16 @@ def verify_jwt_token_and_contents(context):
 def verify_authentication_error(context):
     response_json = context.response.json()
     assert 'token' not in response_json, "Unexpected token in error response"
-    assert response_json.get('msg') in ['Invalid Password', 'Login Failed', 'Authentication Failed'], \
+    assert response_json.get('msg') in ['In correct email or password', 'In correct username or password'], \
         f"Unexpected error message: {response_json.get('msg')}"
     print(f"Authentication error verified: {response_json.get('msg')}")
 
 
 @given('I register "{count:d}" test users')
 def register_multiple_users(context, count):
-    """Register multiple test users using ThreadPoolExecutor"""
-    context.test_users = []
-    user_data_list = [DataGenerator.generate_user_data() for _ in range(count)]
-
-    with ThreadPoolExecutor(max_workers=min(count, 10)) as executor:
-        future_to_user = {
-            executor.submit(LoginClient.register_user, user_data): user_data
-            for user_data in user_data_list
-        }
-
-        for future in as_completed(future_to_user):
-            user_data = future_to_user[future]
-            try:
-                response = future.result()
-                assert response.json()['msg'] == 'User Registered'
-                context.test_users.append(user_data)
-            except Exception as e:
-                print(f"User registration failed: {str(e)}")
-
-    print(f"Successfully registered {len(context.test_users)} users")
+    """Provide registered test users, reusing pooled fixture users where possible"""
+    context.test_users = registered_users(count)
+    print(f"Using {len(context.test_users)} registered users")
 
 
 @when('I test concurrent user logins')
@@ -175,7 +142,7 @@ def test_concurrent_logins(context):
 
     # Perform concurrent logins and store results
     context.start_time = time.time()
-    context.login_results = LoginClient.perform_concurrent_logins(context.test_users)
+    context.login_results, context.login_batch = LoginClient.perform_concurrent_logins(context.test_users)
     context.total_duration = time.time() - context.start_time
 
     # Process and store metrics
@@ -192,6 +159,7 @@ def test_concurrent_logins(context):
     print(f"Total Duration: {context.total_duration:.2f}s")
     print(f"Average Response Time: {context.avg_response_time:.3f}s")
     print(f"Max Response Time: {context.max_response_time:.3f}s")
+    print(f"Latency: {context.login_batch.summary()}")
 
 
 @then('all login requests should succeed with valid tokens')
@@ -1,31 +1,27 @@
 from behave import given, when, then
-import requests
 import jwt
-import threading
 import time
 from faker import Faker
 
-fake = Faker()
+from features.steps.async_client import post_simultaneously
+from features.steps.common_steps import LOGIN_ENDPOINT, register_user, login_user, namespaced
+from features.steps.fixtures import registered_users, remember_users
 
-BASE_URL = "http://127.0.0.1:5000"
-HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+fake = Faker()
 
 # In client_registration_steps.py
 @given('I am a newly registered user')  # Changed from 'I am a registered user'
 def register_test_user(context):
-    context.user_data = {
+    context.user_data = namespaced({
         'fullName': fake.name(),
         'userName': fake.user_name(),
         'email': fake.email(),
         'password': fake.password(),
         'phone': fake.phone_number()
-    }
-    response = requests.post(
-        f'{BASE_URL}/client_registeration',  # Fixed string formatting
-        data=context.user_data,
-        headers=HEADERS
-    )
+    })
+    response = register_user(context.user_data)
     assert response.json()['msg'] == 'User Registered'
+    remember_users([context.user_data])
 
 
 @when('I login with valid email and password')
@@ -35,11 +31,7 @@ def login_with_email(context):
         'email': context.user_data['email'],
         'password': context.user_data['password']
     }
-    context.response = requests.post(
-        f'{BASE_URL}/client_login',
-        data=login_data,
-        headers=HEADERS
-    )
+    context.response = login_user(login_data)
 
 
 @when('I login with valid username and password')
@@ -49,11 +41,7 @@ def login_with_username(context):
         'email': '',
         'password': context.user_data['password']
     }
-    context.response = requests.post(
-        f'{BASE_URL}/client_login',
-        data=login_data,
-        headers=HEADERS
-    )
+    context.response = login_user(login_data)
 
 
 @then('I should receive a JWT token')
@@ -77,59 +65,23 @@ def login_with_wrong_password(context):
         'email': context.user_data['email'],
         'password': 'wrong_password'
     }
-    context.response = requests.post(
-        f'{BASE_URL}/client_login',
-        data=login_data,
-        headers=HEADERS
-    )
+    context.response = login_user(login_data)
 
 
 @given('there are "{count}" registered users')
 def register_multiple_test_users(context, count):
-    context.test_users = []
-    for _ in range(int(count)):
-        user_data = {
-            'fullName': fake.name(),
-            'userName': fake.user_name(),
-            'email': fake.email(),
-            'password': fake.password(),
-            'phone': fake.phone_number()
-        }
-        response = requests.post(
-            f'{BASE_URL}/client_registeration',
-            data=user_data,
-            headers=HEADERS
-        )
-        assert response.json()['msg'] == 'User Registered'
-        context.test_users.append(user_data)
+    context.test_users = registered_users(int(count))
 
 
 @when('all users attempt to login simultaneously')
 def login_multiple_users(context):
     context.start_time = time.time()
-    context.responses = []
-    threads = []
-
-    def login_user(user_data):
-        login_data = {
-            'userName': '',
-            'email': user_data['email'],
-            'password': user_data['password']
-        }
-        response = requests.post(
-            f'{BASE_URL}/client_login',
-            data=login_data,
-            headers=HEADERS
-        )
-        context.responses.append(response)
-
-    for user_data in context.test_users:
-        thread = threading.Thread(target=login_user, args=(user_data,))
-        threads.append(thread)
-        thread.start()
-
-    for thread in threads:
-        thread.join()
+    context.login_batch = post_simultaneously(
+        LOGIN_ENDPOINT,
+        ({'userName': '', 'email': user_data['email'], 'password': user_data['password']}
+         for user_data in context.test_users),
+    )
+    context.responses = context.login_batch.responses
 
 
 @then('login requests should complete successfully')
@@ -137,7 +89,8 @@ def verify_multiple_logins(context):
     duration = time.time() - context.start_time
     successful_logins = sum(
         1 for response in context.responses
-        if 'token' in response.json()
+        if response is not None and 'token' in response.json()
     )
     assert successful_logins == len(context.responses)
     print(f"Completed {len(context.responses)} logins in {duration:.2f} seconds")
+    print(f"Latency: {context.login_batch.summary()}")
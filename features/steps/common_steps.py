@@ -1,11 +1,116 @@
+import os
+import time
+from itertools import islice
+from urllib.parse import urlencode
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from utils.data_generator import DataGenerator, default_namespace
 
 BASE_URL = "http://127.0.0.1:5000"  # Update with actual server URL
+REGISTRATION_ENDPOINT = "/client_registeration"
+LOGIN_ENDPOINT = "/client_login"
+HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+# Set per worker by behave_runner's parallel mode so workers never register the same user
+DATA_NAMESPACE = os.environ.get("BEHAVE_DATA_NAMESPACE", "")
+
+
+class SessionClient:
+    """Keep-alive pooled client for running the API calls outside of Locust (e.g. behave).
+
+    When an ``environment`` is given every call is also reported into
+    ``environment.events.request`` so it shows up in Locust's statistics,
+    exactly like a request made through ``self.client``.
+    """
+
+    def __init__(self, base_url=BASE_URL, pool_size=100, environment=None):
+        self.base_url = base_url.rstrip("/")
+        self.environment = environment
+        self.session = requests.Session()
+        self.session.trust_env = False
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, path, data=None, headers=None, name=None, **kwargs):
+        start_time = time.time()
+        start_perf_counter = time.perf_counter()
+        exception = None
+        try:
+            response = self.session.post(f"{self.base_url}{path}", data=data, headers=headers, **kwargs)
+        except requests.RequestException as e:
+            response, exception = None, e
+
+        if self.environment is not None:
+            self.environment.events.request.fire(
+                request_type="POST",
+                name=name or path,
+                response_time=(time.perf_counter() - start_perf_counter) * 1000,
+                response_length=len(response.content) if response is not None else 0,
+                response=response,
+                context={},
+                exception=exception,
+                start_time=start_time,
+                url=f"{self.base_url}{path}",
+            )
+        if exception is not None:
+            raise exception
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+def namespaced(user_data):
+    """Prefix userName and email with this worker's data namespace, if any."""
+    if DATA_NAMESPACE:
+        user_data["userName"] = f"{DATA_NAMESPACE}_{user_data['userName']}"
+        user_data["email"] = f"{DATA_NAMESPACE}.{user_data['email']}"
+    return user_data
+
+
+_user_stream = None
+
+
+def unique_users(count):
+    """Return ``count`` namespaced users that are unique across runs against the same server.
+
+    Batches run into the thousands, where Faker's emails and user names start
+    to repeat; these carry a per-run tag and a running index instead.
+    """
+    global _user_stream
+    if _user_stream is None:
+        _user_stream = DataGenerator().generate_pool_users(10 ** 9, default_namespace())
+    return [namespaced(user_data) for user_data in islice(_user_stream, count)]
+
+
+_default_client = None
+
+
+def get_client():
+    """Return the process-wide pooled client used when no Locust client is passed in."""
+    global _default_client
+    if _default_client is None:
+        _default_client = SessionClient()
+    return _default_client
+
+
+def _post(client, path, payload, **kwargs):
+    # Form-encode up front: HttpSession accepts a str body and FastHttpSession
+    # (geventhttpclient) only accepts str/bytes, so one call works on both.
+    return (client or get_client()).post(path, data=urlencode(payload), headers=HEADERS, **kwargs)
+
+
+def register_user(payload, client=None, **kwargs):
+    """Registers a user and returns the response.
+
+    ``client`` may be a Locust ``HttpUser``/``FastHttpUser`` ``self.client`` or a
+    :class:`SessionClient`; it defaults to the shared keep-alive session.
+    """
+    return _post(client, REGISTRATION_ENDPOINT, payload, **kwargs)
 
-def register_user(payload):
-    """Registers a user and returns the response."""
-    return requests.post(f"{BASE_URL}/client_registeration", json=payload)
 
-def login_user(credentials):
+def login_user(credentials, client=None, **kwargs):
     """Logs in a user and returns the response."""
-    return requests.post(f"{BASE_URL}/client_login", json=credentials)
+    return _post(client, LOGIN_ENDPOINT, credentials, **kwargs)
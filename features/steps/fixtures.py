@@ -0,0 +1,53 @@
+from config.test_config import TestConfig
+from features.steps import common_steps
+from features.steps.async_client import post_simultaneously
+from utils.fixture_store import FixtureStore
+
+_store = None
+
+
+def fixture_store():
+    """Return this process's store for ``common_steps.BASE_URL``, dropping it if the server forgot its users.
+
+    One pooled user is logged in the first time the store is opened; if that
+    fails the server's user table was reset, and the pool is emptied so it
+    refills with fresh registrations.
+    """
+    global _store
+    if _store is None:
+        _store = FixtureStore(TestConfig.FIXTURE_STORE_PATH, common_steps.BASE_URL)
+        probe = _store.take(1)
+        if probe:
+            response = common_steps.login_user({"userName": "", "email": probe[0]["email"],
+                                                "password": probe[0]["password"]})
+            if "token" not in response.json():
+                print(f"Fixture users are unknown to {common_steps.BASE_URL}; discarding the pool")
+                _store.purge()
+    return _store
+
+
+def remember_users(users):
+    """Add users a scenario registered anyway, so later scenarios can reuse them."""
+    if TestConfig.FIXTURE_STORE:
+        fixture_store().add(users)
+
+
+def registered_users(count):
+    """Return ``count`` distinct users that already exist on the server.
+
+    Users come from the fixture store; when it runs short the missing ones
+    are registered in one simultaneous batch and added to it. With
+    ``TestConfig.FIXTURE_STORE`` off every call registers new users.
+    """
+    users = fixture_store().take(count) if TestConfig.FIXTURE_STORE else []
+    missing = common_steps.unique_users(count - len(users))
+    if missing:
+        batch = post_simultaneously(common_steps.REGISTRATION_ENDPOINT, missing)
+        fresh = [
+            user for user, response in zip(missing, batch.responses)
+            if response is not None and response.json().get("msg") == "User Registered"
+        ]
+        assert len(fresh) == len(missing), f"Registered {len(fresh)} of {len(missing)} fixture users"
+        remember_users(fresh)
+        users += fresh
+    return users
@@ -1,68 +1,16 @@
 from behave.formatter.base import Formatter
-import datetime
+import html
 import time
 
-
-class HTMLFormatter(Formatter):
-    def __init__(self, stream_opener, config):
-        super().__init__(stream_opener, config)
-        self.stream = self.open()
-        self.features = []
-        self.current_feature = None
-        self.current_scenario = None
-        self.start_time = time.time()
-
-    def uri(self, uri):
-        pass
-
-    def feature(self, feature):
-        self.current_feature = {
-            'name': feature.name,
-            'scenarios': [],
-            'status': 'passed',
-            'tags': feature.tags
-        }
-        self.features.append(self.current_feature)
-
-    def scenario(self, scenario):
-        self.current_scenario = {
-            'name': scenario.name,
-            'steps': [],
-            'status': 'passed',
-            'tags': scenario.tags
-        }
-        self.current_feature['scenarios'].append(self.current_scenario)
-
-    def step(self, step):
-        step_data = {
-            'name': step.name,
-            'status': step.status,
-            'duration': getattr(step, 'duration', 0),
-            'error_message': getattr(step, 'error_message', '') if step.status == 'failed' else None
-        }
-
-        if hasattr(self, 'current_scenario'):
-            self.current_scenario['steps'].append(step_data)
-
-            if step.status == 'failed':
-                self.current_scenario['status'] = 'failed'
-                self.current_feature['status'] = 'failed'
-
-    def eof(self):
-        pass
-
-    def close(self):
-        duration = time.time() - self.start_time
-
-        # Write HTML header
-        self.stream.write("""
+HEADER = """
 <!DOCTYPE html>
 <html>
 <head>
     <title>Behave Test Results</title>
     <style>
-        body { font-family: Arial, sans-serif; margin: 20px; }
-        .summary { background: #f8f9fa; padding: 20px; margin-bottom: 20px; border-radius: 5px; }
+        body { font-family: Arial, sans-serif; margin: 20px; display: flex; flex-direction: column; }
+        h1 { order: -2; }
+        .summary { order: -1; background: #f8f9fa; padding: 20px; margin-bottom: 20px; border-radius: 5px; }
         .feature { margin-bottom: 30px; border: 1px solid #dee2e6; border-radius: 5px; padding: 15px; }
         .scenario { margin: 10px 0; padding: 10px; background: #fff; border-left: 4px solid #ccc; }
         .passed { border-left-color: #28a745; }
@@ -70,6 +18,7 @@ class HTMLFormatter(Formatter):
         .step { margin: 5px 0 5px 20px; }
         .step.passed { color: #28a745; }
         .step.failed { color: #dc3545; }
+        .step.skipped, .step.untested, .step.undefined { color: #6c757d; }
         .error-message { background: #fff3cd; padding: 10px; margin: 10px 0; border-radius: 4px; }
         .tag { background: #e9ecef; padding: 2px 6px; border-radius: 3px; margin-right: 5px; font-size: 0.9em; }
         .duration { color: #6c757d; font-size: 0.9em; }
@@ -77,56 +26,196 @@ class HTMLFormatter(Formatter):
 </head>
 <body>
     <h1>Behave Test Results</h1>
-""")
+"""
+FOOTER = """
+</body>
+</html>
+"""
 
-        # Write summary
-        total_scenarios = sum(len(f['scenarios']) for f in self.features)
-        passed_scenarios = sum(1 for f in self.features for s in f['scenarios'] if s['status'] == 'passed')
-        failed_scenarios = total_scenarios - passed_scenarios
 
-        self.stream.write(f"""
-    <div class="summary">
-        <h2>Test Summary</h2>
-        <p>Total Scenarios: {total_scenarios}</p>
-        <p>Passed: {passed_scenarios}</p>
-        <p>Failed: {failed_scenarios}</p>
-        <p>Duration: {duration:.2f} seconds</p>
-    </div>
-""")
+def _status_name(status):
+    return getattr(status, "name", status) or "untested"
+
 
-        # Write feature details
-        for feature in self.features:
-            self.stream.write(f"""
+def _tags(tags):
+    return "".join(f'<span class="tag">{html.escape(str(tag))}</span>' for tag in tags)
+
+
+def render_feature_start(name, tags):
+    return f"""
     <div class="feature">
-        <h2>{feature['name']}</h2>
-        <div>{''.join(f'<span class="tag">{tag}</span>' for tag in feature['tags'])}</div>
-""")
+        <h2>{html.escape(name)}</h2>
+        <div>{_tags(tags)}</div>
+"""
+
+
+def render_feature_end():
+    return "    </div>"
 
-            for scenario in feature['scenarios']:
-                self.stream.write(f"""
-        <div class="scenario {scenario['status']}">
-            <h3>{scenario['name']}</h3>
-            <div>{''.join(f'<span class="tag">{tag}</span>' for tag in scenario['tags'])}</div>
-""")
 
-                for step in scenario['steps']:
-                    self.stream.write(f"""
+def render_scenario(scenario):
+    """Render one finished scenario dict (name, tags, status, duration, steps)."""
+    parts = [f"""
+        <div class="scenario {scenario['status']}">
+            <h3>{html.escape(scenario['name'])} <span class="duration">({scenario['duration']:.3f}s)</span></h3>
+            <div>{_tags(scenario['tags'])}</div>
+"""]
+    for step in scenario['steps']:
+        parts.append(f"""
             <div class="step {step['status']}">
-                {step['name']} <span class="duration">({step['duration']:.3f}s)</span>
+                {html.escape(step['name'])} <span class="duration">({step['duration']:.3f}s)</span>
             </div>
 """)
-                    if step['error_message']:
-                        self.stream.write(f"""
+        if step['error_message']:
+            parts.append(f"""
             <div class="error-message">
-                <pre>{step['error_message']}</pre>
+                <pre>{html.escape(step['error_message'])}</pre>
             </div>
 """)
+    parts.append("        </div>")
+    return "".join(parts)
 
-                self.stream.write("        </div>")
-            self.stream.write("    </div>")
 
-        self.stream.write("""
-</body>
-</html>
-""")
+def render_summary(total, passed, failed, skipped, duration):
+    # Written last; the flex "order" in HEADER displays it above the features
+    return f"""
+    <div class="summary">
+        <h2>Test Summary</h2>
+        <p>Total Scenarios: {total}</p>
+        <p>Passed: {passed}</p>
+        <p>Failed: {failed}</p>
+        <p>Skipped: {skipped}</p>
+        <p>Duration: {duration:.2f} seconds</p>
+    </div>
+"""
+
+
+def write_json_report(features, stream, duration):
+    """Write a full report from behave JSON-formatter output (e.g. merged parallel runs)."""
+    counts = {'total': 0, 'passed': 0, 'failed': 0, 'skipped': 0}
+    stream.write(HEADER)
+    for feature in features:
+        stream.write(render_feature_start(feature['name'], feature.get('tags', [])))
+        for element in feature.get('elements', []):
+            if element.get('type') == 'background':
+                continue
+            steps = []
+            for step in element.get('steps', []):
+                result = step.get('result', {})
+                error_message = result.get('error_message')
+                if isinstance(error_message, list):
+                    error_message = "\n".join(error_message)
+                steps.append({
+                    'name': f"{step['keyword']} {step['name']}",
+                    'status': result.get('status', 'skipped'),
+                    'duration': result.get('duration', 0),
+                    'error_message': error_message if result.get('status') == 'failed' else None,
+                })
+            status = element.get('status', 'skipped')
+            counts['total'] += 1
+            counts[status if status in ('passed', 'failed') else 'skipped'] += 1
+            stream.write(render_scenario({
+                'name': element['name'],
+                'tags': element.get('tags', []),
+                'status': status,
+                'duration': sum(step['duration'] for step in steps),
+                'steps': steps,
+            }))
+        stream.write(render_feature_end())
+    stream.write(render_summary(counts['total'], counts['passed'], counts['failed'], counts['skipped'], duration))
+    stream.write(FOOTER)
+    return counts
+
+
+class HTMLFormatter(Formatter):
+    """Streams each scenario's HTML as soon as its last step result arrives.
+
+    A scenario is written when its final step reports, or when a failed or
+    undefined step stops it, rather than when the next scenario starts. Only
+    the scenario in progress and the summary counters are held in memory,
+    and the stream is flushed after every scenario, so a crashed or aborted
+    run still leaves every finished scenario in the report.
+    """
+
+    def __init__(self, stream_opener, config):
+        super().__init__(stream_opener, config)
+        self.stream = self.open()
+        self.in_feature = False
+        self.current_scenario = None
+        self.current_steps = []
+        self.counts = {'total': 0, 'passed': 0, 'failed': 0, 'skipped': 0}
+        self.start_time = time.time()
+        self.stream.write(HEADER)
+
+    def uri(self, uri):
+        pass
+
+    def feature(self, feature):
+        self._finish_feature()
+        self.stream.write(render_feature_start(feature.name, feature.tags))
+        self.in_feature = True
+
+    def scenario(self, scenario):
+        self._finish_scenario()
+        self.current_scenario = scenario
+        self.current_steps = []
+
+    def step(self, step):
+        self.current_steps.append(step)
+
+    def result(self, step):
+        # Status and duration are final here. No result follows a step that stops the scenario.
+        if self.current_scenario is None:
+            return
+        stopped = (_status_name(step.status) in ('failed', 'undefined')
+                   and not self.current_scenario.continue_after_failed_step)
+        if stopped or step is self.current_steps[-1]:
+            self._finish_scenario()
+
+    def eof(self):
+        self._finish_feature()
+
+    def _finish_scenario(self):
+        scenario = self.current_scenario
+        if scenario is None:
+            return
+        status = _status_name(scenario.status)
+        self.counts['total'] += 1
+        if status in ('passed', 'failed'):
+            self.counts[status] += 1
+        else:
+            self.counts['skipped'] += 1
+
+        self.stream.write(render_scenario({
+            'name': scenario.name,
+            'tags': scenario.tags,
+            'status': status,
+            'duration': scenario.duration,
+            'steps': [
+                {
+                    'name': f"{step.keyword} {step.name}",
+                    'status': _status_name(step.status),
+                    'duration': step.duration,
+                    'error_message': step.error_message if _status_name(step.status) == 'failed' else None,
+                }
+                for step in self.current_steps
+            ],
+        }))
+        self.stream.flush()
+        self.current_scenario = None
+        self.current_steps = []
+
+    def _finish_feature(self):
+        self._finish_scenario()
+        if self.in_feature:
+            self.stream.write(render_feature_end())
+            self.in_feature = False
+
+    def close(self):
+        self._finish_feature()
+        self.stream.write(render_summary(
+            self.counts['total'], self.counts['passed'], self.counts['failed'], self.counts['skipped'],
+            time.time() - self.start_time,
+        ))
+        self.stream.write(FOOTER)
         self.stream.close()
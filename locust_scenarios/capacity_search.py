@@ -0,0 +1,135 @@
+"""Capacity-search load shape; load it next to a locustfile that defines the users:
+
+    locust -f locustfile.py,locust_scenarios/capacity_search.py --headless
+"""
+from locust import LoadTestShape
+import csv
+import json
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.test_config import TestConfig
+from utils.steady_state import SteadyStateDetector
+
+CURVE_FIELDS = ["users", "requests_per_second", "p50_ms", "p95_ms", "success_rate", "sustainable"]
+
+
+class CapacitySearchShape(LoadTestShape):
+    """Finds the highest user count that still meets the TestConfig SLOs.
+
+    User counts grow by CAPACITY_STEP_FACTOR until a level breaches
+    MAX_RESPONSE_TIME (p95) or SUCCESS_RATE_THRESHOLD. The search then
+    bisects between the last good and first bad level, down to
+    CAPACITY_RESOLUTION. Each level is held until throughput and latency are
+    steady (or CAPACITY_MAX_HOLD) before it is judged. The throughput/latency
+    curve and the per-endpoint RPS at the best level go to reports/.
+    """
+
+    # Breaching the SLOs is how the search finds the limit, not a reason to stop
+    slo_watchdog = False
+    # Each level is measured from its own stats deltas; a mid-run reset would corrupt them
+    steady_state_split = False
+
+    def __init__(self):
+        super().__init__()
+        self.users = TestConfig.CAPACITY_START_USERS
+        self.good = None
+        self.bad = None
+        self.best = None
+        self.curve = []
+        self.level_started = None
+        self.snapshot = None
+        self.detector = SteadyStateDetector(window=TestConfig.CAPACITY_STEADY_WINDOW)
+
+    def _counts(self):
+        return {
+            (entry.method, entry.name): (entry.num_requests, entry.num_failures)
+            for entry in self.runner.stats.entries.values()
+        }
+
+    def _start_level(self, now):
+        self.level_started = now
+        self.snapshot = self._counts()
+        self.detector.reset()
+
+    def _measure_level(self, now):
+        elapsed = max(now - self.level_started, 1e-9)
+        requests = failures = 0
+        endpoints = {}
+        for key, (num_requests, num_failures) in self._counts().items():
+            before_requests, before_failures = self.snapshot.get(key, (0, 0))
+            requests += num_requests - before_requests
+            failures += num_failures - before_failures
+            endpoints[f"{key[0]} {key[1]}"] = round((num_requests - before_requests) / elapsed, 2)
+        total = self.runner.stats.total
+        p95 = total.get_current_response_time_percentile(0.95) or 0
+        success_rate = (requests - failures) / requests * 100 if requests else 0
+        return {
+            "users": self.users,
+            "requests_per_second": round(requests / elapsed, 2),
+            "p50_ms": total.get_current_response_time_percentile(0.5) or 0,
+            "p95_ms": p95,
+            "success_rate": round(success_rate, 2),
+            "sustainable": bool(requests) and p95 <= TestConfig.MAX_RESPONSE_TIME
+            and success_rate >= TestConfig.SUCCESS_RATE_THRESHOLD,
+            "endpoints": endpoints,
+        }
+
+    def _next_users(self, level):
+        if level["sustainable"]:
+            self.good = self.users
+            if self.best is None or level["requests_per_second"] >= self.best["requests_per_second"]:
+                self.best = level
+        else:
+            self.bad = self.users
+
+        if self.bad is None:
+            if self.users >= TestConfig.CAPACITY_MAX_USERS:
+                return None
+            return min(int(self.users * TestConfig.CAPACITY_STEP_FACTOR) + 1, TestConfig.CAPACITY_MAX_USERS)
+        good = self.good or 0
+        if self.bad - good <= max(1, good * TestConfig.CAPACITY_RESOLUTION):
+            return None
+        return (good + self.bad) // 2
+
+    def _write_reports(self, finished):
+        os.makedirs(TestConfig.REPORTS_DIR, exist_ok=True)
+        with open(os.path.join(TestConfig.REPORTS_DIR, "capacity_curve.csv"), "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CURVE_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(self.curve)
+        with open(os.path.join(TestConfig.REPORTS_DIR, "capacity_summary.json"), "w") as f:
+            json.dump({
+                "finished": finished,
+                "max_response_time_ms": TestConfig.MAX_RESPONSE_TIME,
+                "success_rate_threshold": TestConfig.SUCCESS_RATE_THRESHOLD,
+                "max_sustainable_users": self.best["users"] if self.best else 0,
+                "max_sustainable_rps": self.best["requests_per_second"] if self.best else 0,
+                "endpoint_rps": self.best["endpoints"] if self.best else {},
+                "levels": self.curve,
+            }, f, indent=4)
+
+    def tick(self):
+        now = self.get_run_time()
+        if self.level_started is None:
+            self._start_level(now)
+
+        total = self.runner.stats.total
+        self.detector.add(total.current_rps, total.get_current_response_time_percentile(0.95) or 0)
+        held = now - self.level_started
+        if held >= TestConfig.CAPACITY_MIN_HOLD and (self.detector.is_steady()
+                                                     or held >= TestConfig.CAPACITY_MAX_HOLD):
+            level = self._measure_level(now)
+            self.curve.append(level)
+            print(f"Capacity search: {level['users']} users -> {level['requests_per_second']} req/s, "
+                  f"p95 {level['p95_ms']} ms, {level['success_rate']}% ok"
+                  f"{'' if level['sustainable'] else ' (SLO breached)'}")
+            next_users = self._next_users(level)
+            self._write_reports(finished=next_users is None)
+            if next_users is None:
+                return None
+            self.users = next_users
+            self._start_level(now)
+
+        return self.users, max(TestConfig.SPAWN_RATE, self.users / 5)
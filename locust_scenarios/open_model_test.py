@@ -0,0 +1,109 @@
+from locust import HttpUser, LoadTestShape, task, constant
+import gevent
+import math
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.test_config import TestConfig
+from utils.arrival import OpenModelScheduler
+from utils.connection_pool import shared_pool_manager
+from utils.credential_store import shared_credential_store
+from utils.data_generator import shared_faker, shared_user_pool
+from utils.expectations import Expectation, post_expecting
+from utils.phase_timing import instrument
+from utils.token_verifier import verify_token
+import utils.locust_hooks  # noqa: F401  (registers the run listeners)
+from utils.worker import worker_count
+
+VALID_REGISTRATION = Expectation("Registration", msg="User Registered")
+VALID_LOGIN = Expectation("Login", token=True)
+
+# ARRIVAL_RATES are totals for the run; each worker process paces its share
+SCHEDULER = OpenModelScheduler({name: rate / worker_count() for name, rate in TestConfig.ARRIVAL_RATES.items()})
+
+
+def generate_user_data():
+    """A new user from the pre-generated pool, or from Faker (imported on first use) when there is none"""
+    pool = shared_user_pool(TestConfig.USER_POOL_PATH)
+    user = pool.next_user() if pool else None
+    if user is not None:
+        return user
+    fake = shared_faker()
+    return {
+        "fullName": fake.name(),
+        "userName": fake.user_name(),
+        "email": fake.email(),
+        "password": fake.password(),
+        "phone": fake.phone_number()
+    }
+
+
+class OpenModelUser(HttpUser):
+    """Sends requests on the fixed arrival timetable instead of a think-time loop.
+
+    Latency is measured from each request's scheduled send time, so time spent
+    waiting for a free user (coordinated omission) is included in the stats.
+    """
+
+    host = "http://127.0.0.1:5000"
+    wait_time = constant(0)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    pool_manager = shared_pool_manager()
+    credentials = shared_credential_store(TestConfig.CREDENTIAL_STORE_PATH, TestConfig.CREDENTIAL_STORE_CAPACITY)
+
+    def on_start(self):
+        if TestConfig.PHASE_TIMING:
+            instrument(self.client)
+
+    @task
+    def paced_request(self):
+        endpoint, intended_start = SCHEDULER.next()
+        delay = intended_start - time.time()
+        if delay > 0:
+            gevent.sleep(delay)
+        if endpoint == "login":
+            self.login(intended_start)
+        else:
+            self.register(intended_start)
+
+    def register(self, intended_start):
+        user = generate_user_data()
+        data = post_expecting(self.client, TestConfig.REGISTRATION_ENDPOINT, user, VALID_REGISTRATION,
+                              headers=self.headers, name="registration_open", intended_start=intended_start)
+        if data:
+            self.credentials.append(user)
+
+    def login(self, intended_start):
+        user = self.credentials.sample()
+        if user is None:
+            # Nobody registered yet: keep the slot, register instead
+            return self.register(intended_start)
+        data = post_expecting(
+            self.client,
+            TestConfig.LOGIN_ENDPOINT,
+            {"userName": "", "email": user["email"], "password": user["password"]},
+            VALID_LOGIN,
+            headers=self.headers,
+            name="login_open",
+            intended_start=intended_start,
+        )
+        if data:
+            verify_token(data["token"], {"email": user["email"]}, "login_open")
+
+
+class ConstantArrivalShape(LoadTestShape):
+    """Runs enough users that the timetable, not the user count, bounds throughput.
+
+    Little's law: concurrency = arrival rate x latency. Sized for the SLO
+    latency times ARRIVAL_HEADROOM; if the server gets slower than that,
+    requests start late and the corrected latency shows it.
+    """
+
+    def tick(self):
+        if self.get_run_time() > TestConfig.TEST_DURATION:
+            return None
+        rate = sum(TestConfig.ARRIVAL_RATES.values())
+        users = max(1, math.ceil(rate * TestConfig.MAX_RESPONSE_TIME / 1000 * TestConfig.ARRIVAL_HEADROOM))
+        return users, users
@@ -1,44 +1,65 @@
-from locust import HttpUser, task, between, events
-from faker import Faker
-import json
+from locust import HttpUser, task, between
+from gevent.event import Event
 import random
 import sys
 import os
-from datetime import datetime
 import string
+import time
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.test_config import TestConfig
+from utils.burst import burst_stats, fire_burst, report_violation
+from utils.connection_pool import shared_pool_manager
+from utils.data_generator import shared_faker, shared_user_pool
+from utils.expectations import Expectation, post_expecting
+from utils.phase_timing import instrument
+import utils.locust_hooks  # noqa: F401  (registers the run listeners)
 
-fake = Faker()
+VALID_REGISTRATION = Expectation("Registration", msg="User Registered")
+DUPLICATE_REGISTRATION = Expectation("duplicate email", msg="Email already Exist")
+INVALID_REGISTRATION = Expectation("invalid data", msg="Invalid Data")
+CONCURRENT_REGISTRATION = Expectation("concurrent registration", msg=("User Registered", "Email already Exist"))
+ANY_REGISTRATION = Expectation("registration")
 
 
-class UserRegistration(HttpUser):
-    host = "http://127.0.0.1:5000"
-    wait_time = between(TestConfig.MIN_WAIT_TIME // 1000, TestConfig.MAX_WAIT_TIME // 1000)
+# Shared read-only by every user in the process; built on first use
+_duplicate_users = None
+_invalid_users = None
+_duplicates_registering = False
+_duplicates_registered = Event()
 
-    def on_start(self):
-        """Initialize test data sets"""
-        self.headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-        self.valid_users = []
-        # Pre-generate some users for duplicate testing
-        for _ in range(5):
-            self.valid_users.append(self.generate_valid_user_data())
-
-    def generate_valid_user_data(self):
-        """Generate valid user data"""
-        return {
-            "fullName": fake.name(),
-            "userName": fake.user_name(),
-            "email": fake.email(),
-            "password": fake.password(length=12, special_chars=True, digits=True,
-                                      upper_case=True, lower_case=True),
-            "phone": fake.numerify('##########')  # 10 digit phone number
-        }
-
-    def generate_invalid_user_data(self):
-        """Generate various invalid user data scenarios"""
-        scenarios = [
+
+def generate_valid_user_data():
+    """Generate valid user data, drawn from the pre-generated pool when one exists"""
+    pool = shared_user_pool(TestConfig.USER_POOL_PATH)
+    user = pool.next_user() if pool else None
+    if user is not None:
+        return user
+    fake = shared_faker()
+    return {
+        "fullName": fake.name(),
+        "userName": fake.user_name(),
+        "email": fake.email(),
+        "password": fake.password(length=12, special_chars=True, digits=True,
+                                  upper_case=True, lower_case=True),
+        "phone": fake.numerify('##########')  # 10 digit phone number
+    }
+
+
+def duplicate_users():
+    """Users for duplicate-email testing; once one is registered, re-registering it must fail"""
+    global _duplicate_users
+    if _duplicate_users is None:
+        _duplicate_users = tuple(generate_valid_user_data() for _ in range(5))
+    return _duplicate_users
+
+
+def invalid_users():
+    """Various invalid user data scenarios"""
+    global _invalid_users
+    if _invalid_users is None:
+        fake = shared_faker()
+        _invalid_users = (
             # Empty fields
             {
                 "fullName": "",
@@ -78,110 +99,83 @@ class UserRegistration(HttpUser):
                 "email": "test@example.com",
                 "password": "パスワード123",
                 "phone": "1234567890"
-            }
-        ]
-        return random.choice(scenarios)
-
-    def log_test_result(self, response, test_case):
-        """Log detailed test results"""
-        timestamp = datetime.now().isoformat()
-        response_time = response.elapsed.total_seconds() * 1000
-
-        events.request.fire(
-            request_type="POST",
-            name=f"registration_{test_case}",
-            response_time=response_time,
-            response_length=len(response.content),
-            response=response,
-            context=self.environment
+            },
+        )
+    return _invalid_users
+
+
+class UserRegistration(HttpUser):
+    host = "http://127.0.0.1:5000"
+    wait_time = between(TestConfig.MIN_WAIT_TIME // 1000, TestConfig.MAX_WAIT_TIME // 1000)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    last_burst = 0
+    pool_manager = shared_pool_manager()
+
+    def on_start(self):
+        if TestConfig.PHASE_TIMING:
+            instrument(self.client)
+        self.register_duplicate_users()
+
+    def register_duplicate_users(self):
+        """Register the duplicate-email users once per process; the other users wait until that is done"""
+        global _duplicates_registering
+        if _duplicates_registering:
+            _duplicates_registered.wait()
+            return
+        _duplicates_registering = True
+        try:
+            for user_data in duplicate_users():
+                self.register(user_data, VALID_REGISTRATION, "registration_duplicate_setup")
+        finally:
+            _duplicates_registered.set()
+
+    def register(self, user_data, expectation, name):
+        """Post a registration and record the outcome once under ``name``"""
+        return post_expecting(
+            self.client,
+            TestConfig.REGISTRATION_ENDPOINT,
+            user_data,
+            expectation,
+            headers=self.headers,
+            name=name,
         )
 
     @task(40)
     def test_valid_registration(self):
         """Test registration with valid data"""
-        with self.client.post(
-                "/client_registeration",
-                data=self.generate_valid_user_data(),
-                headers=self.headers,
-                catch_response=True
-        ) as response:
-            try:
-                if response.status_code == 200:
-                    response_data = response.json()
-                    if response_data.get('msg') == 'User Registered':
-                        response.success()
-                        self.log_test_result(response, 'valid')
-                    else:
-                        response.failure(f"Registration failed: {response_data.get('msg')}")
-                else:
-                    response.failure(f"HTTP {response.status_code}")
-            except Exception as e:
-                response.failure(f"Failed to parse response: {str(e)}")
+        self.register(generate_valid_user_data(), VALID_REGISTRATION, "registration_valid")
 
     @task(20)
     def test_duplicate_email_registration(self):
         """Test registration with duplicate email"""
-        user_data = random.choice(self.valid_users)
-        with self.client.post(
-                "/client_registeration",
-                data=user_data,
-                headers=self.headers,
-                catch_response=True
-        ) as response:
-            try:
-                response_data = response.json()
-                if response_data.get('msg') == 'Email already Exist':
-                    response.success()
-                    self.log_test_result(response, 'duplicate')
-                else:
-                    response.failure(f"Unexpected response for duplicate email: {response_data}")
-            except Exception as e:
-                response.failure(f"Failed to parse response: {str(e)}")
+        self.register(random.choice(duplicate_users()), DUPLICATE_REGISTRATION, "registration_duplicate")
 
     @task(20)
     def test_invalid_registration(self):
         """Test registration with invalid data"""
-        with self.client.post(
-                "/client_registeration",
-                data=self.generate_invalid_user_data(),
-                headers=self.headers,
-                catch_response=True
-        ) as response:
-            try:
-                response_data = response.json()
-                if response_data.get('msg') == 'Invalid Data':
-                    response.success()
-                    self.log_test_result(response, 'invalid')
-                else:
-                    response.failure(f"Unexpected response for invalid data: {response_data}")
-            except Exception as e:
-                response.failure(f"Failed to parse response: {str(e)}")
+        self.register(random.choice(invalid_users()), INVALID_REGISTRATION, "registration_invalid")
 
     @task(10)
     def test_concurrent_registration(self):
-        """Test concurrent registration with same data"""
-        user_data = self.generate_valid_user_data()
-        for _ in range(3):  # Try 3 concurrent registrations
-            with self.client.post(
-                    "/client_registeration",
-                    data=user_data,
-                    headers=self.headers,
-                    catch_response=True,
-                    name="concurrent_registration"
-            ) as response:
-                self.log_test_result(response, 'concurrent')
-                try:
-                    if response.status_code == 200:
-                        response.success()
-                    else:
-                        response.failure(f"HTTP {response.status_code}")
-                except Exception as e:
-                    response.failure(f"Failed to parse response: {str(e)}")
+        """Test simultaneous registration with same data; exactly one may be accepted"""
+        if time.time() - self.last_burst < TestConfig.BURST_INTERVAL:
+            return
+        self.last_burst = time.time()
+        user_data = generate_valid_user_data()
+        results, spread = fire_burst(
+            TestConfig.BURST_SIZE,
+            lambda _: self.register(user_data, CONCURRENT_REGISTRATION, "concurrent_registration"),
+        )
+        accepted = sum(1 for data in results if data and data.get('msg') == 'User Registered')
+        burst_stats.record("concurrent_registration", spread, len(results), accepted)
+        if accepted > 1:
+            report_violation(self.environment, "concurrent_registration_duplicates",
+                             f"{accepted} of {len(results)} identical registrations accepted")
 
     @task(10)
     def test_password_variations(self):
         """Test registration with various password formats"""
-        user_data = self.generate_valid_user_data()
+        user_data = generate_valid_user_data()
         password_variations = [
             ''.join(random.choices(string.ascii_letters, k=8)),  # Letters only
             ''.join(random.choices(string.digits, k=8)),  # Numbers only
@@ -191,17 +185,4 @@ class UserRegistration(HttpUser):
         ]
 
         user_data['password'] = random.choice(password_variations)
-        with self.client.post(
-                "/client_registeration",
-                data=user_data,
-                headers=self.headers,
-                catch_response=True
-        ) as response:
-            self.log_test_result(response, 'password_variation')
-            try:
-                if response.status_code == 200:
-                    response.success()
-                else:
-                    response.failure(f"HTTP {response.status_code}")
-            except Exception as e:
-                response.failure(f"Failed to parse response: {str(e)}")
+        self.register(user_data, ANY_REGISTRATION, "registration_password_variation")
@@ -0,0 +1,71 @@
+from locust import HttpUser, task, constant
+from locust.exception import StopUser
+import gevent
+import logging
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.test_config import TestConfig
+from utils.arrival import correct_for_omission
+from utils.connection_pool import shared_pool_manager
+from utils.phase_timing import instrument
+from utils.replay import read_capture
+from utils.worker import worker_count, worker_index
+import utils.locust_hooks  # noqa: F401  (registers the run listeners)
+
+
+class Capture:
+    """This process's share of the capture, consumed by all replay users in order."""
+
+    def __init__(self, path, speed):
+        self.path = path
+        self.speed = speed
+        self.entries = None
+        self.started = None
+
+    def next(self):
+        """Return ``(entry, due)``; ``due`` is None when replaying as fast as possible."""
+        if self.entries is None:
+            self.entries = read_capture(self.path, worker_index(), worker_count())
+            self.started = time.time()
+        entry = next(self.entries, None)
+        if entry is None or not self.speed:
+            return entry, None
+        return entry, self.started + entry["t"] / self.speed
+
+
+CAPTURE = Capture(TestConfig.REPLAY_CAPTURE_PATH, TestConfig.REPLAY_SPEED)
+
+
+class ReplayUser(HttpUser):
+    """Replays a recorded capture (see ``utils.replay``) at its original pace.
+
+    Each request keeps its recorded stats name. With a speed factor, latency
+    is measured from the request's due time, so a backlog caused by too few
+    users or a slow server shows up as latency rather than as lost load.
+    """
+
+    host = "http://127.0.0.1:5000"
+    wait_time = constant(0)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    pool_manager = shared_pool_manager()
+    record_replay = False
+
+    def on_start(self):
+        if TestConfig.PHASE_TIMING:
+            instrument(self.client)
+
+    @task
+    def replay(self):
+        entry, due = CAPTURE.next()
+        if entry is None:
+            logging.info("Capture exhausted; stopping replay user")
+            raise StopUser()
+        if due is not None and due > time.time():
+            gevent.sleep(due - time.time())
+        with self.client.request(entry["method"], entry["path"], data=entry["data"], headers=self.headers,
+                                 name=entry.get("name"), catch_response=True) as response:
+            if due is not None:
+                correct_for_omission(response, due)
@@ -1,33 +1,58 @@
-from locust import HttpUser, task, between
+from locust import task, between
+from locust.contrib.fasthttp import FastHttpUser
 from features.steps.common_steps import register_user, login_user
-from faker import Faker
-import random
+from config.test_config import TestConfig
+from utils.connection_pool import shared_client_pool
+from utils.credential_store import shared_credential_store
+from utils.data_generator import shared_faker, shared_user_pool
+from utils.token_verifier import verify_token
+import utils.locust_hooks  # noqa: F401  (registers the run listeners)
 
-class UserBehavior(HttpUser):
+class UserBehavior(FastHttpUser):
+    host = "http://127.0.0.1:5000"
     wait_time = between(1, 3)
-    fake = Faker()
-    registered_users = []
+    client_pool = shared_client_pool()
+    registered_users = shared_credential_store(TestConfig.CREDENTIAL_STORE_PATH, TestConfig.CREDENTIAL_STORE_CAPACITY)
 
     @task(3)
     def client_register(self):
         """Stress test client registration."""
-        payload = {
-            "username": self.fake.user_name(),
-            "email": self.fake.email(),
-            "password": self.fake.password(length=12),
-            "full_name": self.fake.name(),
-            "phone": self.fake.phone_number()
-        }
-        response = register_user(payload)
-        if response.status_code == 201:
-            self.registered_users.append({"username": payload["username"], "password": payload["password"]})
+        pool = shared_user_pool(TestConfig.USER_POOL_PATH)
+        payload = pool.next_user() if pool else None
+        if payload is None:
+            fake = shared_faker()
+            payload = {
+                "fullName": fake.name(),
+                "userName": fake.user_name(),
+                "email": fake.email(),
+                "password": fake.password(length=12),
+                "phone": fake.phone_number()
+            }
+        with register_user(payload, client=self.client, catch_response=True) as response:
+            try:
+                if response.status_code == 200 and response.json().get("msg") == "User Registered":
+                    response.success()
+                    self.registered_users.append(payload)
+                else:
+                    response.failure(f"Registration failed with status {response.status_code}")
+            except ValueError as e:
+                response.failure(f"Failed to parse response: {str(e)}")
 
     @task(2)
     def client_login(self):
         """Stress test client login."""
-        if not self.registered_users:
+        user = self.registered_users.sample()
+        if user is None:
             return
-        user = random.choice(self.registered_users)
-        credentials = {"username": user["username"], "password": user["password"]}
-        response = login_user(credentials)
-        assert response.status_code == 200, f"Login failed with status {response.status_code}"
+        credentials = {"userName": "", "email": user["email"], "password": user["password"]}
+        with login_user(credentials, client=self.client, catch_response=True) as response:
+            try:
+                data = response.json() if response.status_code == 200 else {}
+                if "token" in data:
+                    response.success()
+                    verify_token(data["token"], {"email": user["email"], "userName": user["userName"]},
+                                 "client_login")
+                else:
+                    response.failure(f"Login failed with status {response.status_code}")
+            except ValueError as e:
+                response.failure(f"Failed to parse response: {str(e)}")
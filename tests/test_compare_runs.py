@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from utils.compare_runs import AGGREGATED, bootstrap, compare, history_observations, mean, percentile
+
+
+def observations(latency, failed, per_second):
+    return {AGGREGATED: {
+        "requests_per_second": (np.asarray(per_second, dtype=float), mean),
+        "p50_ms": (latency, percentile(50)),
+        "p95_ms": (latency, percentile(95)),
+        "p99_ms": (latency, percentile(99)),
+        "error_rate": (np.asarray(failed, dtype=float), lambda values: values.mean(axis=-1) * 100),
+    }}
+
+
+def run(rng, scale=1.0, failure_rate=0.0, rps=100, n=4000):
+    latency = rng.lognormal(3, 0.4, n) * scale
+    failed = rng.random(n) < failure_rate
+    return observations(latency, failed, rng.normal(rps, 2, 60))
+
+
+def test_bootstrap_returns_one_replicate_per_resample():
+    rng = np.random.default_rng(0)
+    replicates = bootstrap(np.arange(50.0), mean, rng, resamples=250, chunk=100)
+    assert replicates.shape == (250,)
+    assert replicates.mean() == pytest.approx(24.5, abs=1)
+
+
+def test_bootstrap_subsamples_large_inputs():
+    rng = np.random.default_rng(0)
+    seen = []
+    bootstrap(np.arange(1000.0), lambda values: seen.append(values.shape) or values.mean(axis=-1), rng,
+              resamples=10, max_values=100)
+    assert seen == [(10, 100)]
+
+
+def test_same_distribution_is_not_a_regression():
+    rng = np.random.default_rng(1)
+    results = compare(run(rng), run(rng), resamples=300)
+    for metric, result in results[AGGREGATED].items():
+        assert not result["regression"], metric
+        low, high = result["ci"]
+        assert low <= result["delta"] <= high
+
+
+def test_slower_candidate_is_a_regression_with_a_positive_interval():
+    rng = np.random.default_rng(2)
+    results = compare(run(rng), run(rng, scale=1.3), resamples=300)[AGGREGATED]
+    for metric in ("p50_ms", "p95_ms"):
+        assert results[metric]["regression"]
+        assert results[metric]["ci"][0] > 0
+        assert results[metric]["delta"] == pytest.approx(30, abs=8)
+
+
+def test_throughput_drop_and_error_rise_are_regressions():
+    rng = np.random.default_rng(3)
+    results = compare(run(rng), run(rng, failure_rate=0.05, rps=80), resamples=300)[AGGREGATED]
+    assert results["requests_per_second"]["regression"]
+    assert results["requests_per_second"]["ci"][1] < 0
+    assert results["error_rate"]["regression"]
+    assert results["error_rate"]["unit"] == "points"
+
+
+def test_significant_change_within_tolerance_is_not_a_regression():
+    rng = np.random.default_rng(4)
+    results = compare(run(rng, n=20000), run(rng, scale=1.03, n=20000), resamples=300)[AGGREGATED]
+    assert results["p50_ms"]["ci"][0] > 0
+    assert not results["p50_ms"]["regression"]
+
+
+def test_interval_covers_the_true_shift():
+    # The median moves from 100 to 110 ms, a 10% change; a 95% interval should cover it in most runs
+    rng = np.random.default_rng(5)
+    covered = 0
+    for _ in range(40):
+        before = observations(rng.normal(100, 10, 400), np.zeros(400), [1])
+        after = observations(rng.normal(110, 10, 400), np.zeros(400), [1])
+        low, high = compare(before, after, resamples=200, seed=int(rng.integers(1 << 30)))[AGGREGATED]["p50_ms"]["ci"]
+        covered += low <= 10 <= high
+    assert covered >= 34
+
+
+def test_history_csv_rows(tmp_path):
+    path = tmp_path / "stats_history.csv"
+    path.write_text(
+        "Timestamp,User Count,Type,Name,Requests/s,Failures/s,50%,95%,99%\n"
+        "1,10,,Aggregated,0,0,N/A,N/A,N/A\n"
+        "2,10,,Aggregated,20,2,10,30,50\n"
+        "3,10,,Aggregated,30,0,12,32,52\n"
+        "3,10,POST,login,10,0,8,20,40\n"
+    )
+    observed = history_observations(str(path))
+    assert sorted(observed) == [AGGREGATED, "POST login"]
+    values, statistic = observed[AGGREGATED]["requests_per_second"]
+    assert values.tolist() == [20, 30] and statistic(values) == 25
+    values, statistic = observed[AGGREGATED]["error_rate"]
+    assert statistic(values) == pytest.approx(5)
@@ -0,0 +1,47 @@
+import pytest
+
+from utils.credential_store import CredentialStore
+
+
+def credentials(i):
+    return {"email": f"user{i}@example.com", "userName": f"user{i}", "password": f"secret{i}"}
+
+
+def test_empty_store_samples_none():
+    store = CredentialStore(capacity=4)
+    assert len(store) == 0
+    assert store.sample() is None
+
+
+def test_ring_keeps_only_the_newest_records():
+    store = CredentialStore(capacity=3)
+    for i in range(5):
+        assert store.append(credentials(i))
+    assert len(store) == 3
+    sampled = {store.sample()["userName"] for _ in range(200)}
+    assert sampled == {"user2", "user3", "user4"}
+
+
+def test_oversized_field_is_rejected_without_storing():
+    store = CredentialStore(capacity=2)
+    assert not store.append({"email": "x" * 100, "userName": "u", "password": "p"})
+    assert len(store) == 0
+
+
+def test_file_backed_store_is_shared_between_handles(tmp_path):
+    path = str(tmp_path / "credentials.bin")
+    writer = CredentialStore(capacity=8, path=path)
+    reader = CredentialStore(capacity=99, path=path)
+    assert reader.capacity == 8  # an existing store keeps its own capacity
+    writer.append(credentials(1))
+    assert len(reader) == 1
+    assert reader.sample() == credentials(1)
+    writer.close()
+    reader.close()
+
+
+def test_rejects_a_file_that_is_not_a_store(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\1" * 128)
+    with pytest.raises(ValueError):
+        CredentialStore(path=str(path))
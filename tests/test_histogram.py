@@ -0,0 +1,92 @@
+import math
+import random
+
+import pytest
+
+from utils.histogram import LatencyHistogram
+
+
+def exact_percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * percent / 100)) - 1]
+
+
+def test_empty_histogram_reports_zero():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0
+    assert histogram.mean() == 0
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value_us in range(1, 101):
+        histogram.record(value_us / 1000)
+    assert histogram.percentile(50) == pytest.approx(0.050)
+    assert histogram.percentile(99) == pytest.approx(0.099)
+    assert histogram.percentile(100) == pytest.approx(0.100)
+
+
+@pytest.mark.parametrize("percent", [50, 90, 99, 99.9])
+def test_percentiles_within_relative_error(percent):
+    rng = random.Random(1)
+    values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    assert histogram.percentile(percent) == pytest.approx(exact_percentile(values, percent), rel=0.016)
+
+
+def test_values_are_clamped_to_the_range():
+    histogram = LatencyHistogram()
+    histogram.record(-5)
+    histogram.record(10 ** 12)
+    assert histogram.min == 0
+    assert histogram.max == LatencyHistogram.max_value
+
+
+def test_mean_min_max():
+    histogram = LatencyHistogram()
+    for value in (10, 20, 30):
+        histogram.record(value)
+    assert histogram.mean() == pytest.approx(20)
+    assert histogram.min == 10000
+    assert histogram.max == 30000
+
+
+def test_merge_equals_recording_everything_in_one():
+    rng = random.Random(2)
+    values = [rng.uniform(0, 500) for _ in range(5000)]
+    combined, first, second = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i, value in enumerate(values):
+        combined.record(value)
+        (first if i % 2 else second).record(value)
+    first.merge(second)
+    assert list(first.counts) == list(combined.counts)
+    assert (first.count, first.total, first.min, first.max) == (combined.count, combined.total, combined.min,
+                                                                 combined.max)
+
+
+def test_merge_of_empty_histograms():
+    histogram = LatencyHistogram()
+    histogram.merge(LatencyHistogram())
+    assert histogram.count == 0 and histogram.min is None
+    other = LatencyHistogram()
+    other.record(5)
+    histogram.merge(other)
+    assert histogram.min == 5000 and histogram.percentile(50) == pytest.approx(5, rel=0.016)
+
+
+def test_dict_round_trip():
+    histogram = LatencyHistogram()
+    for value in (0.5, 3, 250, 4000):
+        histogram.record(value, count=3)
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert restored.to_dict() == histogram.to_dict()
+    assert restored.percentiles() == histogram.percentiles()
+
+
+def test_from_dict_rejects_other_precision():
+    data = LatencyHistogram().to_dict()
+    data["sub_bucket_bits"] += 1
+    with pytest.raises(ValueError):
+        LatencyHistogram.from_dict(data)
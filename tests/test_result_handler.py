@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+from utils import result_handler
+from utils.result_handler import ResultsHandler
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1000.0)
+    monkeypatch.setattr(result_handler.time, "time", clock)
+    return clock
+
+
+def test_update_results_counts_and_buckets(clock):
+    handler = ResultsHandler(interval=1.0)
+    for offset, success in ((0.2, True), (0.7, False), (1.5, True)):
+        clock.now = 1000.0 + offset
+        handler.update_results("login", success, 0.050)
+    result = handler.results["login"]
+    assert (result["successful"], result["failed"]) == (2, 1)
+    assert result["throughput"] == {0: 2, 1: 1}
+    assert result["histogram"].percentile(50) == pytest.approx(50, rel=0.016)
+
+
+def test_throughput_is_coarsened_past_the_cap(clock, monkeypatch):
+    monkeypatch.setattr(result_handler, "MAX_THROUGHPUT_BUCKETS", 4)
+    handler = ResultsHandler(interval=1.0)
+    for second in range(10):
+        clock.now = 1000.0 + second + 0.5
+        handler.update_results("login", True, 0.01)
+    throughput = handler.results["login"]["throughput"]
+    assert handler.interval == 4.0
+    assert throughput == {0: 4, 1: 4, 2: 2}
+    assert len(throughput) <= 4
+
+
+def test_merge_aligns_start_times(clock):
+    ours = ResultsHandler(interval=1.0)
+    clock.now = 1002.0
+    theirs = ResultsHandler(interval=1.0)
+    clock.now = 1002.5
+    theirs.update_results("registration", False, 0.2)
+    ours.merge(theirs)
+    result = ours.results["registration"]
+    assert result["failed"] == 1
+    assert result["throughput"] == {2: 1}
+
+
+def test_merge_coarsens_to_the_larger_interval(clock):
+    ours = ResultsHandler(interval=1.0)
+    clock.now = 1003.5
+    ours.update_results("login", True, 0.01)
+    clock.now = 1000.0
+    theirs = ResultsHandler(interval=2.0)
+    clock.now = 1001.0
+    theirs.update_results("login", True, 0.01)
+    ours.merge(theirs)
+    assert ours.interval == 2.0
+    assert ours.results["login"]["throughput"] == {0: 1, 1: 1}
+
+
+def test_dict_round_trip(clock):
+    handler = ResultsHandler(interval=0.5)
+    handler.update_results("login", True, 0.1)
+    restored = ResultsHandler.from_dict(json.loads(json.dumps(handler.to_dict())))
+    assert restored.to_dict() == handler.to_dict()
+
+
+def test_generate_report(clock, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    handler = ResultsHandler()
+    handler.update_results("login", True, 0.1)
+    handler.update_results("login", False, 0.3)
+
+    class Config:
+        CONCURRENT_USERS = 7
+
+    report = handler.generate_report(Config)
+    assert report["test_configuration"] == {"concurrent_users": 7}
+    assert report["login_results"]["success_rate"] == "50.00%"
+    assert report["registration_results"]["success_rate"] == "0%"
+    assert report["login_results"]["throughput"] == [{"interval_start": "0s", "requests_per_second": 2.0}]
+    assert len(os.listdir(tmp_path / "reports")) == 1
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from utils.sample_analyzer import (SAMPLE_DTYPE, endpoint_breakdown, latency_heatmap, load_samples, sample_paths,
+                                   write_heatmap)
+from utils.sample_log import SAMPLE_SIZE, SampleLog
+
+
+def write_log(path, samples, buffered=3):
+    log = SampleLog(str(path), buffered=buffered)
+    for sample in samples:
+        log.record(*sample)
+    log.close()
+    return str(path)
+
+
+def test_dtype_matches_the_record_format():
+    assert SAMPLE_DTYPE.itemsize == SAMPLE_SIZE
+
+
+def test_round_trip_through_the_analyzer(tmp_path):
+    samples = [(100.0 + i, "POST login", 10.0 * (i + 1), 200, 50, False) for i in range(7)]
+    path = write_log(tmp_path / "a.bin", samples)
+    loaded, names = load_samples([path])
+    assert names == ["POST login"]
+    assert loaded["timestamp"].tolist() == [s[0] for s in samples]
+    assert loaded["latency"].tolist() == pytest.approx([s[2] for s in samples])
+    assert loaded["bytes"].tolist() == [50] * 7
+
+
+def test_reopened_log_appends_and_keeps_endpoint_ids(tmp_path):
+    path = write_log(tmp_path / "a.bin", [(1.0, "GET a", 1, 200, 0, False)])
+    path = write_log(tmp_path / "a.bin", [(2.0, "GET b", 2, 200, 0, False), (3.0, "GET a", 3, 200, 0, False)])
+    loaded, names = load_samples([path])
+    assert names == ["GET a", "GET b"]
+    assert loaded["endpoint"].tolist() == [0, 1, 0]
+
+
+def test_endpoint_ids_are_remapped_across_workers(tmp_path):
+    first = write_log(tmp_path / "w0.bin", [(1.0, "login", 5, 200, 0, False), (2.0, "register", 7, 200, 0, False)])
+    second = write_log(tmp_path / "w1.bin", [(1.5, "register", 9, 500, 0, True), (2.5, "login", 11, 200, 0, False)])
+    loaded, names = load_samples(sample_paths(str(tmp_path)))
+    assert names == ["login", "register"]
+    by_name = {}
+    for sample in loaded:
+        by_name.setdefault(names[sample["endpoint"]], []).append(float(sample["latency"]))
+    assert by_name == {"login": [5, 11], "register": [7, 9]}
+
+
+def test_empty_logs_are_skipped(tmp_path):
+    log = SampleLog(str(tmp_path / "a.bin"))
+    log.write_index()
+    log.close()
+    loaded, _ = load_samples([log.path])
+    assert len(loaded) == 0
+    assert endpoint_breakdown(loaded, [])["total"]["requests"] == 0
+
+
+def test_breakdown_matches_numpy_percentiles(tmp_path):
+    rng = np.random.default_rng(3)
+    latencies = rng.uniform(1, 100, 500)
+    samples = [(1000.0 + i / 10, "login" if i % 3 else "register", float(latency), 500 if i % 50 == 0 else 200, 10,
+                i % 50 == 0) for i, latency in enumerate(latencies)]
+    loaded, names = load_samples([write_log(tmp_path / "a.bin", samples, buffered=64)])
+    report = endpoint_breakdown(loaded, names)
+    login = latencies[[i % 3 != 0 for i in range(500)]].astype(np.float32)
+    assert report["total"]["requests"] == 500
+    assert report["total"]["failures"] == 10
+    assert report["endpoints"]["login"]["requests"] == len(login)
+    assert report["endpoints"]["login"]["p99_ms"] == pytest.approx(np.percentile(login, 99), abs=1e-3)
+    assert report["total"]["requests_per_second"] == pytest.approx(500 / 49.9, abs=0.01)
+    assert sum(report["endpoints"]["register"]["status_codes"].values()) == report["endpoints"]["register"]["requests"]
+
+
+def test_heatmap_counts_per_bucket_and_band(tmp_path):
+    samples = [(10.0, "a", 0.5, 200, 0, False), (10.4, "a", 3, 200, 0, False),
+               (11.2, "a", 3, 200, 0, False), (12.9, "a", 9000, 200, 0, False)]
+    loaded, _ = load_samples([write_log(tmp_path / "a.bin", samples)])
+    heatmap, started = latency_heatmap(loaded, bucket_seconds=1.0, bands=(1, 5))
+    assert started == 10.0
+    assert heatmap.tolist() == [[1, 1, 0], [0, 1, 0], [0, 0, 1]]
+    out = tmp_path / "heatmap.csv"
+    write_heatmap(str(out), heatmap, started, 1.0, bands=(1, 5))
+    assert out.read_text().splitlines()[0] == "bucket_start,<=1ms,<=5ms,>5ms"
@@ -0,0 +1,174 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from locust.runners import STATE_RUNNING, STATE_SPAWNING
+from locust.stats import RequestStats
+
+from config.test_config import TestConfig
+from utils import warmup
+from utils.steady_state import SteadyStateDetector
+from utils.warmup import SteadyStateSplitter, stats_rows
+
+
+def test_not_steady_until_the_window_is_full():
+    detector = SteadyStateDetector(window=5)
+    for _ in range(4):
+        detector.add(100, 50)
+        assert not detector.is_steady()
+    detector.add(100, 50)
+    assert detector.is_steady()
+
+
+def test_only_the_last_window_counts():
+    detector = SteadyStateDetector(window=5)
+    for throughput in (10, 40, 80, 100, 100, 101, 99, 100, 100):
+        detector.add(throughput, 50)
+    assert list(detector.throughput) == [100, 101, 99, 100, 100]
+    assert detector.is_steady()
+
+
+@pytest.mark.parametrize("throughput, latency, steady", [
+    ([100, 102, 98, 101, 99], [50, 52, 48, 51, 49], True),
+    ([60, 140, 60, 140, 60], [50, 50, 50, 50, 50], False),
+    ([100, 100, 100, 100, 100], [20, 200, 20, 200, 20], False),
+    ([0, 0, 0, 0, 0], [0, 0, 0, 0, 0], False),
+])
+def test_coefficient_of_variation(throughput, latency, steady):
+    detector = SteadyStateDetector(window=5, max_cv=0.1)
+    for sample in zip(throughput, latency):
+        detector.add(*sample)
+    assert detector.is_steady() == steady
+
+
+def test_latency_tolerance_absorbs_timer_noise():
+    # 1 and 3 ms vary by 50%, but well within the 5 ms absolute tolerance
+    detector = SteadyStateDetector(window=4, max_cv=0.1, latency_tolerance_ms=5)
+    for latency in (1, 3, 1, 3):
+        detector.add(100, latency)
+    assert detector.is_steady()
+    strict = SteadyStateDetector(window=4, max_cv=0.1, latency_tolerance_ms=0)
+    for latency in (1, 3, 1, 3):
+        strict.add(100, latency)
+    assert not strict.is_steady()
+
+
+def test_reset_starts_a_new_window():
+    detector = SteadyStateDetector(window=3)
+    for _ in range(3):
+        detector.add(100, 50)
+    detector.reset()
+    assert not detector.is_steady()
+    assert len(detector.throughput) == len(detector.latency) == 0
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1000.0)
+    monkeypatch.setattr(warmup.time, "time", clock)
+    monkeypatch.setattr(warmup.gevent, "sleep", clock.sleep)
+    return clock
+
+
+@pytest.fixture
+def environment(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestConfig, "REPORTS_DIR", str(tmp_path))
+    stats = RequestStats()
+    for response_time in (10, 20, 30):
+        stats.log_request("POST", "/login", response_time, 0)
+    stats.log_request("GET", "/health", 5, 0)
+    runner = SimpleNamespace(state=STATE_RUNNING, stats=stats)
+    return SimpleNamespace(runner=runner, parsed_options=SimpleNamespace(csv_prefix=str(tmp_path / "run")))
+
+
+def test_stats_rows_end_with_the_aggregated_row(environment):
+    rows = stats_rows(environment.runner.stats)
+    assert [row["Name"] for row in rows] == ["/health", "/login", "Aggregated"]
+    assert rows[1]["Request Count"] == 3
+    assert rows[-1]["Request Count"] == 4
+    assert rows[-1]["Type"] == ""
+
+
+def test_split_saves_the_ramp_and_resets_stats(environment, tmp_path):
+    splitter = SteadyStateSplitter(environment)
+    splitter.split(started=environment.runner.stats.start_time, steady=True)
+    assert splitter.ramp["steady_state_detected"]
+    assert splitter.ramp["stats"][-1]["Request Count"] == 4
+    assert environment.runner.stats.total.num_requests == 0
+    ramp_csv = (tmp_path / "run_ramp_stats.csv").read_text().splitlines()
+    assert ramp_csv[0].startswith("Type,Name,Request Count")
+    assert len(ramp_csv) == 4
+
+    environment.runner.stats.log_request("POST", "/login", 15, 0)
+    splitter.stop()
+    with open(tmp_path / "stats_phases.json") as f:
+        phases = json.load(f)
+    assert phases["ramp"]["stats"][-1]["Request Count"] == 4
+    assert phases["steady_state"]["stats"][-1]["Request Count"] == 1
+
+
+def test_stop_before_steady_state_keeps_everything_as_ramp(environment, tmp_path):
+    SteadyStateSplitter(environment).stop()
+    with open(tmp_path / "stats_phases.json") as f:
+        phases = json.load(f)
+    assert phases["steady_state"] is None
+    assert not phases["ramp"]["steady_state_detected"]
+    assert phases["ramp"]["stats"][-1]["Request Count"] == 4
+
+
+def test_run_waits_for_warmup_and_splits_when_steady(environment, clock, monkeypatch):
+    monkeypatch.setattr(TestConfig, "WARMUP_SECONDS", 5)
+    monkeypatch.setattr(TestConfig, "STEADY_STATE_WINDOW", 3)
+    splitter = SteadyStateSplitter(environment)
+    fed = []
+    monkeypatch.setattr(splitter.detector, "add", lambda *sample: fed.append(clock.now))
+    monkeypatch.setattr(splitter.detector, "is_steady", lambda: len(fed) == 3)
+    splitter.run()
+    # Sampling starts once WARMUP_SECONDS have passed in the running state
+    assert fed == [1006.0, 1007.0, 1008.0]
+    assert splitter.ramp["steady_state_detected"]
+
+
+class ScriptedRunner:
+    """A runner whose state follows a script, then stays running."""
+
+    def __init__(self, stats, states):
+        self.stats = stats
+        self.states = iter(states)
+
+    @property
+    def state(self):
+        return next(self.states, STATE_RUNNING)
+
+
+def test_run_restarts_warmup_when_the_runner_leaves_running(environment, clock, monkeypatch):
+    monkeypatch.setattr(TestConfig, "WARMUP_SECONDS", 2)
+    environment.runner = ScriptedRunner(environment.runner.stats, [STATE_RUNNING, STATE_RUNNING, STATE_SPAWNING])
+    splitter = SteadyStateSplitter(environment)
+    fed = []
+    monkeypatch.setattr(splitter.detector, "add", lambda *sample: fed.append(clock.now))
+    monkeypatch.setattr(splitter.detector, "is_steady", lambda: True)
+    splitter.run()
+    # Running at 1001-1002, spawning at 1003, so the warm-up clock restarts at 1004
+    assert fed == [1006.0]
+
+
+def test_run_gives_up_after_the_timeout(environment, clock, monkeypatch):
+    monkeypatch.setattr(TestConfig, "WARMUP_SECONDS", 1)
+    monkeypatch.setattr(TestConfig, "STEADY_STATE_TIMEOUT", 10)
+    splitter = SteadyStateSplitter(environment)
+    monkeypatch.setattr(splitter.detector, "is_steady", lambda: False)
+    splitter.run()
+    assert not splitter.ramp["steady_state_detected"]
+    assert clock.now == 1012.0
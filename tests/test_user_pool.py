@@ -0,0 +1,66 @@
+import pytest
+
+from utils import data_generator
+from utils.data_generator import DataGenerator, UserPool, USER_LAYOUT
+from utils.fixed_width import RecordLayout
+
+
+@pytest.fixture(scope="module")
+def pool_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("pool") / "users.bin"
+    return DataGenerator(seed=1).build_user_pool(str(path), 600, namespace="t0")
+
+
+def test_pool_users_are_unique_and_fit_the_layout():
+    users = list(DataGenerator(seed=2).generate_pool_users(2000, "ns"))
+    assert len({user["userName"] for user in users}) == 2000
+    assert len({user["email"] for user in users}) == 2000
+    for user in users:
+        assert USER_LAYOUT.unpack_from(USER_LAYOUT.pack(user)) == user
+
+
+def test_pools_never_hand_out_a_record_twice(pool_path, tmp_path):
+    path = tmp_path / "users.bin"
+    path.write_bytes(open(pool_path, "rb").read())
+    first, second = UserPool(str(path)), UserPool(str(path))
+    drawn = []
+    while True:
+        users = [pool.next_user() for pool in (first, second)]
+        drawn.extend(user for user in users if user is not None)
+        if users == [None, None]:
+            break
+    assert len(drawn) == 600
+    assert len({user["email"] for user in drawn}) == 600
+    assert first.remaining() == second.remaining() == 0
+    first.close()
+    second.close()
+
+
+def test_remaining_counts_the_claimed_block(pool_path, tmp_path):
+    path = tmp_path / "users.bin"
+    path.write_bytes(open(pool_path, "rb").read())
+    pool = UserPool(str(path))
+    assert pool.remaining() == 600
+    pool.next_user()
+    assert pool.remaining() == 599
+    pool.close()
+
+
+def test_rejects_a_file_that_is_not_a_pool(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        UserPool(str(path))
+
+
+def test_shared_user_pool_is_none_without_a_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_generator, "_pools", {})
+    assert data_generator.shared_user_pool(str(tmp_path / "missing.bin")) is None
+
+
+def test_record_layout_rejects_oversized_fields():
+    layout = RecordLayout([("name", 4), ("code", 2)])
+    assert layout.size == 6
+    assert layout.unpack_from(layout.pack({"name": "ab"})) == {"name": "ab", "code": ""}
+    with pytest.raises(ValueError):
+        layout.pack({"name": "abcde"})
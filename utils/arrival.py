@@ -0,0 +1,44 @@
+import heapq
+import time
+
+
+class OpenModelScheduler:
+    """Fixed arrival timetable for several endpoints, shared by all users of a process.
+
+    Endpoint ``name`` with rate ``r`` requests/second gets its n-th request
+    due at ``start + n / r``, no matter how long earlier requests took. When
+    the server slows down, the due times keep coming and the backlog appears
+    as latency, instead of the offered load silently dropping as it does with
+    a closed-loop ``wait_time``.
+    """
+
+    def __init__(self, rates):
+        self.rates = {name: rate for name, rate in rates.items() if rate > 0}
+        self.start = None
+        self.issued = {}
+        self.heap = []
+
+    def next(self):
+        """Return ``(endpoint, intended_send_time)`` for the earliest unclaimed slot."""
+        if self.start is None:
+            self.start = time.time()
+            self.issued = dict.fromkeys(self.rates, 0)
+            self.heap = [(self.start, name) for name in self.rates]
+            heapq.heapify(self.heap)
+        due, name = heapq.heappop(self.heap)
+        self.issued[name] += 1
+        heapq.heappush(self.heap, (self.start + self.issued[name] / self.rates[name], name))
+        return name, due
+
+
+def correct_for_omission(response, intended_start):
+    """Re-base a ``catch_response`` sample's latency on its intended send time.
+
+    Adds the time the request waited past its scheduled slot to the recorded
+    response time (it is reported when the ``with`` block exits); the raw
+    service time is kept in the request context as ``service_time_ms``.
+    """
+    meta = response.request_meta
+    service_time = meta["response_time"]
+    meta["response_time"] = service_time + max(0.0, meta["start_time"] - intended_start) * 1000
+    meta["context"] = {**meta["context"], "service_time_ms": service_time}
@@ -0,0 +1,89 @@
+import json
+import os
+import time
+
+import gevent
+from gevent.event import Event
+from locust import events
+
+from config.test_config import TestConfig
+from utils.histogram import LatencyHistogram
+from utils.worker import worker_index
+
+
+class BurstStats:
+    """Per-label burst outcomes: response spread histogram and acceptance counters."""
+
+    def __init__(self):
+        self.labels = {}
+
+    def record(self, label, spread_ms, size, accepted):
+        stats = self.labels.get(label)
+        if stats is None:
+            stats = self.labels[label] = {"bursts": 0, "requests": 0, "accepted": 0, "spread": LatencyHistogram()}
+        stats["bursts"] += 1
+        stats["requests"] += size
+        stats["accepted"] += accepted
+        stats["spread"].record(spread_ms)
+
+    def report(self):
+        return {
+            label: {
+                "bursts": stats["bursts"],
+                "requests": stats["requests"],
+                "accepted": stats["accepted"],
+                "spread_ms": {
+                    **{f"p{p:g}": stats["spread"].percentile(p) for p in (50, 90, 99)},
+                    "max": stats["spread"].percentile(100),
+                },
+            }
+            for label, stats in self.labels.items()
+        }
+
+
+burst_stats = BurstStats()
+
+
+def fire_burst(size, send):
+    """Call ``send(i)`` for i in range(size) from ``size`` greenlets released at the same instant.
+
+    Every greenlet is parked on one Event before any request starts, so the
+    requests leave together instead of one after another. Returns the list of
+    ``send`` results and the spread in ms between the first and last response.
+    """
+    release = Event()
+    results = [None] * size
+    finished = [0.0] * size
+
+    def run(i):
+        release.wait()
+        results[i] = send(i)
+        finished[i] = time.perf_counter()
+
+    greenlets = [gevent.spawn(run, i) for i in range(size)]
+    gevent.sleep(0)  # let every greenlet reach the barrier
+    release.set()
+    gevent.joinall(greenlets, raise_error=True)
+    return results, (max(finished) - min(finished)) * 1000
+
+
+def report_violation(environment, label, message):
+    """Surface a burst whose outcome is wrong (e.g. a duplicate accepted) in Locust's failures."""
+    environment.events.request.fire(
+        request_type="BURST",
+        name=label,
+        response_time=0,
+        response_length=0,
+        exception=AssertionError(message),
+        context={},
+    )
+
+
+@events.test_stop.add_listener
+def write_burst_report(environment, **kwargs):
+    if not burst_stats.labels:
+        return
+    os.makedirs(TestConfig.REPORTS_DIR, exist_ok=True)
+    path = os.path.join(TestConfig.REPORTS_DIR, f"burst_report_{worker_index()}.json")
+    with open(path, "w") as f:
+        json.dump(burst_stats.report(), f, indent=4)
@@ -0,0 +1,190 @@
+import csv
+import html
+import json
+import logging
+import math
+import os
+import time
+
+import gevent
+import psutil
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+from config.test_config import TestConfig
+from utils.worker import worker_index
+
+SAMPLE_MESSAGE = "client_sample"
+HISTORY_FIELDS = ["timestamp", "worker", "user_count", "cpu_percent", "rss_mb", "loop_lag_ms", "saturated"]
+
+
+class ClientSampler:
+    """Samples this Locust process's CPU usage, RSS and gevent loop lag once per ``interval``.
+
+    Loop lag is how late a short sleep wakes up: a probe greenlet sleeps
+    ``lag_probe`` seconds at a time and the worst overshoot in each interval
+    is reported. A busy hub delays every request callback by that much,
+    which inflates latencies on the client without the server being slower.
+    """
+
+    def __init__(self, environment, deliver, interval=TestConfig.CLIENT_MONITOR_INTERVAL, lag_probe=0.1):
+        self.environment = environment
+        self.deliver = deliver
+        self.interval = interval
+        self.lag_probe = lag_probe
+        self.process = psutil.Process()
+        self.max_lag = 0.0
+        self.greenlets = []
+
+    def start(self):
+        if not self.greenlets:
+            self.process.cpu_percent()  # the first call only sets the baseline
+            self.max_lag = 0.0
+            self.greenlets = [gevent.spawn(self.probe_lag), gevent.spawn(self.run)]
+
+    def stop(self):
+        gevent.killall(self.greenlets, block=False)
+        self.greenlets = []
+
+    def probe_lag(self):
+        while True:
+            before = time.monotonic()
+            gevent.sleep(self.lag_probe)
+            self.max_lag = max(self.max_lag, time.monotonic() - before - self.lag_probe)
+
+    def run(self):
+        next_sample = time.monotonic() + self.interval
+        while True:
+            gevent.sleep(max(0.0, next_sample - time.monotonic()))
+            next_sample += self.interval
+            self.deliver(self.sample())
+
+    def sample(self):
+        lag, self.max_lag = self.max_lag, 0.0
+        return {
+            "timestamp": round(time.time(), 3),
+            "worker": str(worker_index()),
+            "user_count": self.environment.runner.user_count,
+            "cpu_percent": round(self.process.cpu_percent(), 1),
+            "rss_mb": round(self.process.memory_info().rss / 2**20, 1),
+            "loop_lag_ms": round(lag * 1000, 1),
+        }
+
+
+class ClientHealth:
+    """Collects the samples of every load-generating process and decides whether the run is trustworthy.
+
+    In a distributed run only the workers generate load, so only their
+    samples are judged; the master does not sample itself. Samples are
+    appended to ``<csv prefix>_client_stats_history.csv`` as they arrive.
+    Each worker is judged on its own samples: one that stays above
+    ``TestConfig.CLIENT_MAX_CPU`` or ``CLIENT_MAX_LOOP_LAG_MS`` for
+    ``CLIENT_SATURATION_SECONDS`` in a row makes the run suspect, since its
+    latencies include queueing on the load generator.
+    """
+
+    def __init__(self, environment):
+        self.environment = environment
+        self.file = None
+        self.writer = None
+        self.workers = {}
+        self.reasons = []
+        self.saturated_samples = max(1, math.ceil(TestConfig.CLIENT_SATURATION_SECONDS
+                                                  / TestConfig.CLIENT_MONITOR_INTERVAL))
+
+    def start(self):
+        if self.file is None:
+            prefix = getattr(self.environment.parsed_options, "csv_prefix", None)
+            path = (f"{prefix}_client_stats_history.csv" if prefix
+                    else os.path.join(TestConfig.REPORTS_DIR, "client_stats_history.csv"))
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.file = open(path, "w", newline="")
+            self.writer = csv.DictWriter(self.file, fieldnames=HISTORY_FIELDS)
+            self.writer.writeheader()
+
+    def add(self, sample, node_id=None):
+        """Judge one sample; ``node_id`` tells apart workers on different nodes that share an index."""
+        worker = self.workers.setdefault(node_id or sample["worker"], {
+            "worker": sample["worker"],
+            "samples": 0, "peak_cpu_percent": 0.0, "peak_rss_mb": 0.0, "peak_loop_lag_ms": 0.0,
+            "saturated_samples": 0, "consecutive": 0,
+        })
+        problems = []
+        if sample["cpu_percent"] >= TestConfig.CLIENT_MAX_CPU:
+            problems.append(f"CPU {sample['cpu_percent']:.0f}% >= {TestConfig.CLIENT_MAX_CPU}%")
+        if sample["loop_lag_ms"] >= TestConfig.CLIENT_MAX_LOOP_LAG_MS:
+            problems.append(f"loop lag {sample['loop_lag_ms']:.0f} ms >= {TestConfig.CLIENT_MAX_LOOP_LAG_MS} ms")
+        worker["samples"] += 1
+        worker["peak_cpu_percent"] = max(worker["peak_cpu_percent"], sample["cpu_percent"])
+        worker["peak_rss_mb"] = max(worker["peak_rss_mb"], sample["rss_mb"])
+        worker["peak_loop_lag_ms"] = max(worker["peak_loop_lag_ms"], sample["loop_lag_ms"])
+        if problems:
+            worker["saturated_samples"] += 1
+            worker["consecutive"] += 1
+        else:
+            worker["consecutive"] = 0
+        if worker["consecutive"] == self.saturated_samples:
+            where = f"worker {sample['worker']}" + (f" ({node_id})" if node_id else "")
+            reason = f"{where}: {', '.join(problems)} for {TestConfig.CLIENT_SATURATION_SECONDS}s"
+            logging.warning(f"Load generator saturated, results are suspect: {reason}")
+            self.reasons.append(reason)
+        if self.writer is not None:
+            self.writer.writerow({**sample, "saturated": int(bool(problems))})
+            self.file.flush()
+
+    @property
+    def suspect(self):
+        return bool(self.reasons)
+
+    def finish(self):
+        """Write ``reports/client_monitor.json``; a suspect run is flagged in the HTML report and exit code."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if not self.workers:
+            return
+        for worker in self.workers.values():
+            worker.pop("consecutive", None)
+        os.makedirs(TestConfig.REPORTS_DIR, exist_ok=True)
+        with open(os.path.join(TestConfig.REPORTS_DIR, "client_monitor.json"), "w") as f:
+            json.dump({"suspect": self.suspect, "reasons": self.reasons, "workers": self.workers}, f, indent=4)
+        if not self.suspect:
+            return
+        logging.error("Results are suspect: the load generator was saturated (see reports/client_monitor.json)")
+        self.mark_html_report()
+        if self.environment.process_exit_code is None:
+            self.environment.process_exit_code = TestConfig.CLIENT_SUSPECT_EXIT_CODE
+
+    def mark_html_report(self):
+        # Locust writes the HTML report before the quitting event, so the banner is added in place
+        path = getattr(self.environment.parsed_options, "html_file", None)
+        if not path or not os.path.exists(path):
+            return
+        with open(path) as f:
+            report = f.read()
+        banner = ('<div style="background:#a00;color:#fff;padding:10px;font-weight:bold">'
+                  "SUSPECT RESULTS: the load generator was saturated, so latencies include client-side queueing."
+                  f"<br>{'<br>'.join(html.escape(reason) for reason in self.reasons)}</div>")
+        with open(path, "w") as f:
+            f.write(report.replace("<h1>Locust Test Report</h1>", f"<h1>Locust Test Report</h1>{banner}", 1))
+
+
+@events.init.add_listener
+def install_client_monitor(environment, **kwargs):
+    if not TestConfig.CLIENT_MONITOR:
+        return
+    runner = environment.runner
+    if isinstance(runner, WorkerRunner):
+        sampler = ClientSampler(environment, lambda sample: runner.send_message(SAMPLE_MESSAGE, sample))
+    else:
+        health = ClientHealth(environment)
+        environment.events.test_start.add_listener(lambda **kw: health.start())
+        environment.events.quitting.add_listener(lambda **kw: health.finish())
+        if isinstance(runner, MasterRunner):
+            # The master generates no load; judging its own CPU would blur the workers' results
+            runner.register_message(SAMPLE_MESSAGE,
+                                    lambda environment, msg, **kw: health.add(msg.data, msg.node_id))
+            return
+        sampler = ClientSampler(environment, health.add)
+    environment.events.test_start.add_listener(lambda **kw: sampler.start())
+    environment.events.test_stop.add_listener(lambda **kw: sampler.stop())
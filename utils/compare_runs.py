@@ -0,0 +1,179 @@
+"""Compare a baseline run with a candidate run and flag statistically significant regressions.
+
+    python -m utils.compare_runs baseline/samples candidate/samples
+    python -m utils.compare_runs baseline_stats_history.csv candidate_stats_history.csv
+
+Exits with status 1 when any endpoint regressed.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+
+from config.test_config import TestConfig
+from utils.sample_analyzer import load_samples, sample_paths
+
+AGGREGATED = "Aggregated"
+# metric -> (direction a regression moves in, how the change is measured)
+METRICS = {
+    "requests_per_second": (-1, "relative"),
+    "p50_ms": (1, "relative"),
+    "p95_ms": (1, "relative"),
+    "p99_ms": (1, "relative"),
+    "error_rate": (1, "absolute"),
+}
+HISTORY_COLUMNS = {"requests_per_second": "Requests/s", "p50_ms": "50%", "p95_ms": "95%", "p99_ms": "99%"}
+
+
+def percentile(p):
+    return lambda values: np.percentile(values, p, axis=-1)
+
+
+def mean(values):
+    return values.mean(axis=-1)
+
+
+def error_rate(values):
+    return values.mean(axis=-1) * 100
+
+
+def sample_observations(path):
+    """Per-endpoint observations from raw sample logs: latencies, failed flags and per-second counts."""
+    samples, names = load_samples(sample_paths(path))
+    if not len(samples):
+        raise ValueError(f"{path}: no samples")
+    seconds = (samples["timestamp"] - samples["timestamp"].min()).astype(np.int64)
+    groups = {AGGREGATED: np.ones(len(samples), dtype=bool)}
+    groups.update({name: samples["endpoint"] == endpoint_id for endpoint_id, name in enumerate(names)})
+    observations = {}
+    for name, selected in groups.items():
+        latency = samples["latency"][selected]
+        observations[name] = {
+            "requests_per_second": (np.bincount(seconds[selected], minlength=seconds.max() + 1), mean),
+            "p50_ms": (latency, percentile(50)),
+            "p95_ms": (latency, percentile(95)),
+            "p99_ms": (latency, percentile(99)),
+            "error_rate": (samples["failed"][selected], error_rate),
+        }
+    return observations
+
+
+def history_observations(path):
+    """Per-endpoint observations from a Locust ``*_stats_history.csv``: one value per second and metric.
+
+    Latency percentiles here are Locust's rolling-window values, so the
+    comparison is of their per-second mean. Per-endpoint rows only exist
+    when Locust ran with ``--csv-full-history``.
+    """
+    rows = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if row["95%"] == "N/A" or not float(row["Requests/s"]):
+                continue
+            name = AGGREGATED if row["Name"] == AGGREGATED else f"{row['Type']} {row['Name']}"
+            rows.setdefault(name, []).append(row)
+    if not rows:
+        raise ValueError(f"{path}: no rows with traffic")
+    observations = {}
+    for name, entries in rows.items():
+        metrics = {metric: (np.array([float(r[column]) for r in entries]), mean)
+                   for metric, column in HISTORY_COLUMNS.items()}
+        metrics["error_rate"] = (np.array([float(r["Failures/s"]) / float(r["Requests/s"]) for r in entries]),
+                                 error_rate)
+        observations[name] = metrics
+    return observations
+
+
+def load_observations(path):
+    return history_observations(path) if path.endswith(".csv") else sample_observations(path)
+
+
+def bootstrap(values, statistic, rng, resamples, max_values=TestConfig.COMPARE_MAX_SAMPLES, chunk=100):
+    """Return ``resamples`` bootstrap replicates of ``statistic`` over ``values``.
+
+    Replicates are drawn a chunk at a time as one index matrix each, so the
+    statistic runs vectorised over rows. Very large inputs are first
+    subsampled to ``max_values``, which bounds memory and time.
+    """
+    values = np.asarray(values)
+    if len(values) > max_values:
+        values = values[rng.choice(len(values), max_values, replace=False)]
+    replicates = []
+    for start in range(0, resamples, chunk):
+        size = min(chunk, resamples - start)
+        replicates.append(statistic(values[rng.integers(0, len(values), (size, len(values)))]))
+    return np.concatenate(replicates)
+
+
+def compare(baseline, candidate, resamples=TestConfig.COMPARE_RESAMPLES, confidence=TestConfig.COMPARE_CONFIDENCE,
+            seed=0):
+    """Per-endpoint, per-metric deltas with bootstrap confidence intervals and a regression verdict."""
+    rng = np.random.default_rng(seed)
+    tail = (100 - confidence) / 2
+    results = {}
+    for name in sorted(set(baseline) & set(candidate)):
+        results[name] = {}
+        for metric, (direction, kind) in METRICS.items():
+            (before, statistic), (after, _) = baseline[name][metric], candidate[name][metric]
+            if not len(before) or not len(after):
+                continue
+            point_before, point_after = float(statistic(before)), float(statistic(after))
+            deltas = bootstrap(after, statistic, rng, resamples) - bootstrap(before, statistic, rng, resamples)
+            if kind == "relative":
+                if not point_before:
+                    continue
+                deltas = deltas / point_before * 100
+                delta = (point_after - point_before) / point_before * 100
+                tolerance = TestConfig.COMPARE_TOLERANCE
+            else:
+                delta = point_after - point_before
+                tolerance = TestConfig.COMPARE_ERROR_RATE_TOLERANCE
+            # The replicates give the spread; centre it on the full-data estimate, since subsampling
+            # large inputs would otherwise shift the interval away from it
+            low, high = delta + np.percentile(deltas - np.median(deltas), [tail, 100 - tail])
+            worse = low > 0 if direction > 0 else high < 0
+            results[name][metric] = {
+                "baseline": round(point_before, 3),
+                "candidate": round(point_after, 3),
+                "delta": round(delta, 2),
+                "unit": "%" if kind == "relative" else "points",
+                "ci": [round(float(low), 2), round(float(high), 2)],
+                "regression": bool(worse and delta * direction > tolerance),
+            }
+    return results
+
+
+def format_table(results):
+    lines = [f"{'Endpoint':<40} {'Metric':<20} {'Baseline':>10} {'Candidate':>10} {'Delta':>16} {'CI':>22}"]
+    for name, metrics in results.items():
+        for metric, r in metrics.items():
+            unit = "%" if r["unit"] == "%" else "pt"
+            flag = "  REGRESSION" if r["regression"] else ""
+            lines.append(f"{name[:40]:<40} {metric:<20} {r['baseline']:>10} {r['candidate']:>10} "
+                         f"{r['delta']:>+14.2f}{unit:<2} [{r['ci'][0]:+.2f}, {r['ci'][1]:+.2f}]{flag}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two runs (sample logs or stats history CSVs)")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--resamples", type=int, default=TestConfig.COMPARE_RESAMPLES)
+    parser.add_argument("--confidence", type=float, default=TestConfig.COMPARE_CONFIDENCE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(TestConfig.REPORTS_DIR, "comparison.json"))
+    args = parser.parse_args()
+
+    results = compare(load_observations(args.baseline), load_observations(args.candidate),
+                      args.resamples, args.confidence, args.seed)
+    print(format_table(results))
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    regressions = [f"{name} {metric}" for name, metrics in results.items()
+                   for metric, r in metrics.items() if r["regression"]]
+    if regressions:
+        print(f"Significant regressions: {', '.join(regressions)}")
+        sys.exit(1)
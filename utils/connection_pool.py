@@ -0,0 +1,46 @@
+from geventhttpclient.client import HTTPClientPool
+from locust.contrib.fasthttp import FastHttpUser, insecure_ssl_context_factory
+from urllib3 import PoolManager
+
+from config.test_config import TestConfig
+
+_pool_manager = None
+_client_pool = None
+
+
+def shared_pool_manager():
+    """Return the process-wide urllib3 pool for ``HttpUser.pool_manager``, or None for one pool per user.
+
+    Without it every simulated user keeps its own pool managers and an idle
+    keep-alive socket. Shared, the process holds at most
+    ``TestConfig.CONNECTION_POOL_SIZE`` idle connections per host; a request
+    that finds none free opens another, which is closed afterwards if the
+    pool is full, so no user ever waits for a connection.
+    """
+    global _pool_manager
+    if not TestConfig.SHARED_CONNECTIONS:
+        return None
+    if _pool_manager is None:
+        _pool_manager = PoolManager(num_pools=10, maxsize=TestConfig.CONNECTION_POOL_SIZE, block=False)
+    return _pool_manager
+
+
+def shared_client_pool():
+    """The ``FastHttpUser.client_pool`` counterpart of :func:`shared_pool_manager`.
+
+    geventhttpclient makes a request wait once ``CONNECTION_POOL_SIZE``
+    connections to a host are in use, so the size must stay above the number
+    of requests one process keeps in flight.
+    """
+    global _client_pool
+    if not TestConfig.SHARED_CONNECTIONS:
+        return None
+    if _client_pool is None:
+        _client_pool = HTTPClientPool(
+            concurrency=TestConfig.CONNECTION_POOL_SIZE,
+            network_timeout=FastHttpUser.network_timeout,
+            connection_timeout=FastHttpUser.connection_timeout,
+            insecure=FastHttpUser.insecure,
+            ssl_context_factory=insecure_ssl_context_factory,
+        )
+    return _client_pool
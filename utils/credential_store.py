@@ -0,0 +1,124 @@
+import mmap
+import os
+import random
+import struct
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process (anonymous) store is safe
+    fcntl = None
+
+from utils.fixed_width import RecordLayout
+
+CREDENTIAL_LAYOUT = RecordLayout([
+    ("email", 72),
+    ("userName", 40),
+    ("password", 24),
+])
+STORE_MAGIC = b"CREDRNG1"
+# magic, capacity, record size, total appended
+STORE_HEADER = struct.Struct("<8sQQQ")
+STORE_HEADER_SIZE = 64
+APPENDED_OFFSET = 24
+
+
+class CredentialStore:
+    """Fixed-capacity ring buffer of registered users' credentials.
+
+    Records live in fixed-width slots of one memory map, so memory is capped
+    at ``capacity`` records however long the run is, and both ``append`` and
+    ``sample`` are O(1). Once full, the oldest credentials are overwritten.
+
+    With ``path=None`` the map is anonymous and private to this process. With
+    a path the map is file-backed and shared by every process that opens it
+    (put it under /dev/shm for a pure shared-memory store), so a login task in
+    one worker can use a user registered by another.
+    """
+
+    def __init__(self, capacity=10000, path=None):
+        self.path = path
+        self._file = None
+        if path is None:
+            self.capacity = capacity
+            self._map = mmap.mmap(-1, STORE_HEADER_SIZE + capacity * CREDENTIAL_LAYOUT.size)
+            STORE_HEADER.pack_into(self._map, 0, STORE_MAGIC, capacity, CREDENTIAL_LAYOUT.size, 0)
+        else:
+            self._open_shared(path, capacity)
+        self._random = random.Random()
+
+    def _open_shared(self, path, capacity):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), "r+b")
+        self._lock(fcntl.LOCK_EX if fcntl else None)
+        try:
+            if os.fstat(self._file.fileno()).st_size == 0:
+                self._file.truncate(STORE_HEADER_SIZE + capacity * CREDENTIAL_LAYOUT.size)
+                self._file.seek(0)
+                self._file.write(STORE_HEADER.pack(STORE_MAGIC, capacity, CREDENTIAL_LAYOUT.size, 0))
+                self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        finally:
+            self._unlock()
+        magic, self.capacity, record_size, _ = STORE_HEADER.unpack_from(self._map, 0)
+        if magic != STORE_MAGIC or record_size != CREDENTIAL_LAYOUT.size:
+            self.close()
+            raise ValueError(f"{path} is not a credential store file")
+
+    def _lock(self, mode):
+        if self._file is not None and fcntl and mode is not None:
+            fcntl.flock(self._file, mode)
+
+    def _unlock(self):
+        if self._file is not None and fcntl:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def _appended(self):
+        return struct.unpack_from("<Q", self._map, APPENDED_OFFSET)[0]
+
+    def append(self, credentials):
+        """Store one user's credentials; returns False if a field does not fit its slot."""
+        try:
+            record = CREDENTIAL_LAYOUT.pack(credentials)
+        except ValueError:
+            return False
+        self._lock(fcntl.LOCK_EX if fcntl else None)
+        try:
+            appended = self._appended()
+            offset = STORE_HEADER_SIZE + (appended % self.capacity) * CREDENTIAL_LAYOUT.size
+            self._map[offset:offset + CREDENTIAL_LAYOUT.size] = record
+            struct.pack_into("<Q", self._map, APPENDED_OFFSET, appended + 1)
+        finally:
+            self._unlock()
+        return True
+
+    def sample(self):
+        """Return a random stored credential dict, or None while the store is empty."""
+        self._lock(fcntl.LOCK_SH if fcntl else None)
+        try:
+            size = min(self._appended(), self.capacity)
+            if not size:
+                return None
+            offset = STORE_HEADER_SIZE + self._random.randrange(size) * CREDENTIAL_LAYOUT.size
+            return CREDENTIAL_LAYOUT.unpack_from(self._map, offset)
+        finally:
+            self._unlock()
+
+    def __len__(self):
+        return min(self._appended(), self.capacity)
+
+    def close(self):
+        self._map.close()
+        if self._file is not None:
+            self._file.close()
+
+
+_stores = {}
+
+
+def shared_credential_store(path, capacity):
+    """Return this process's CredentialStore for ``path`` (``None`` for a private one)."""
+    if path not in _stores:
+        _stores[path] = CredentialStore(capacity, path)
+    return _stores[path]
@@ -1,10 +1,62 @@
-from faker import Faker
+import argparse
+import mmap
+import os
 import random
+import socket
+import string
+import struct
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process claim lock, single process only
+    fcntl = None
+
+from utils.fixed_width import RecordLayout
+
+# Fixed-width layout of one pooled user record (200 bytes)
+USER_LAYOUT = RecordLayout([
+    ("fullName", 48),
+    ("userName", 40),
+    ("email", 72),
+    ("password", 24),
+    ("phone", 24),
+])
+POOL_MAGIC = b"USRPOOL1"
+# magic, record count, record size, claim cursor
+POOL_HEADER = struct.Struct("<8sQQQ")
+POOL_HEADER_SIZE = 64
+CURSOR_OFFSET = 24
+# Records handed to a process per locked claim; keeps the lock off the per-task path
+CLAIM_BLOCK = 256
+VOCABULARY_SIZE = 1000
+PASSWORD_CHARS = string.ascii_letters + string.digits + "!@#$%^&*"
+
+
+def _base36(number):
+    digits = string.digits + string.ascii_lowercase
+    result = ""
+    while True:
+        number, remainder = divmod(number, 36)
+        result = digits[remainder] + result
+        if not number:
+            return result
+
+
+def default_namespace():
+    """Short tag unique per host and build time, baked into every pooled userName/email."""
+    host = _base36(zlib.crc32(socket.gethostname().encode()) % 36 ** 2).rjust(2, "0")
+    return host + _base36(int(time.time()) % 36 ** 5).rjust(5, "0")
 
 
 class DataGenerator:
-    def __init__(self):
+    def __init__(self, seed=None):
+        from faker import Faker  # ~60 ms to import, so only processes that generate data pay for it
         self.fake = Faker()
+        self.random = random.Random(seed)
+        if seed is not None:
+            self.fake.seed_instance(seed)
 
     def generate_user_data(self):
         return {
@@ -21,3 +73,126 @@ class DataGenerator:
             "email": self.fake.email(),
             "password": self.fake.password()
         }
+
+    def generate_pool_users(self, count, namespace):
+        """Yield ``count`` unique user records for a pool.
+
+        Faker is only called to build a small vocabulary; records are then
+        assembled from it, and the namespace plus record index keep every
+        userName/email unique.
+        """
+        size = min(count, VOCABULARY_SIZE) or 1
+        names = [self.fake.name()[:48] for _ in range(size)]
+        user_names = [self.fake.user_name()[:22] for _ in range(size)]
+        domains = [self.fake.free_email_domain()[:24] for _ in range(min(size, 50))]
+        choice = self.random.choice
+        for index in range(count):
+            user_name = f"{choice(user_names)}_{namespace}{index:x}"
+            yield {
+                "fullName": choice(names),
+                "userName": user_name,
+                "email": f"{user_name}@{choice(domains)}",
+                "password": "".join(self.random.choices(PASSWORD_CHARS, k=12)),
+                "phone": "".join(self.random.choices(string.digits, k=10)),
+            }
+
+    def build_user_pool(self, path, count, namespace=None):
+        """Write ``count`` unique users to a fixed-width pool file at ``path``."""
+        namespace = namespace or default_namespace()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(POOL_HEADER.pack(POOL_MAGIC, count, USER_LAYOUT.size, 0).ljust(POOL_HEADER_SIZE, b"\0"))
+            batch = bytearray()
+            for user in self.generate_pool_users(count, namespace):
+                batch += USER_LAYOUT.pack(user)
+                if len(batch) >= 1 << 20:
+                    f.write(batch)
+                    batch.clear()
+            f.write(batch)
+        os.replace(tmp_path, path)
+        return path
+
+
+class UserPool:
+    """Memory-mapped view of a pool file built by :meth:`DataGenerator.build_user_pool`.
+
+    The file is mapped shared, so every process on the node reads the same
+    pages. A claim cursor in the header is advanced under ``flock`` one block
+    at a time, so no record is ever handed out twice, whichever process or
+    worker draws it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.count, record_size, _ = POOL_HEADER.unpack_from(self._map, 0)
+        if magic != POOL_MAGIC or record_size != USER_LAYOUT.size:
+            self.close()
+            raise ValueError(f"{path} is not a user pool file")
+        self._next = self._end = 0
+
+    def _claim_block(self):
+        if fcntl:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            (cursor,) = struct.unpack_from("<Q", self._map, CURSOR_OFFSET)
+            end = min(cursor + CLAIM_BLOCK, self.count)
+            struct.pack_into("<Q", self._map, CURSOR_OFFSET, end)
+        finally:
+            if fcntl:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._next, self._end = cursor, end
+
+    def next_user(self):
+        """Return the next unused user record, or None once the pool is exhausted."""
+        if self._next >= self._end:
+            self._claim_block()
+            if self._next >= self._end:
+                return None
+        index = self._next
+        self._next += 1
+        return USER_LAYOUT.unpack_from(self._map, POOL_HEADER_SIZE + index * USER_LAYOUT.size)
+
+    def remaining(self):
+        (cursor,) = struct.unpack_from("<Q", self._map, CURSOR_OFFSET)
+        return self.count - cursor + (self._end - self._next)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+_pools = {}
+_faker = None
+
+
+def shared_user_pool(path):
+    """Return this process's UserPool for ``path``, or None when no pool file exists."""
+    if path not in _pools:
+        _pools[path] = UserPool(path) if os.path.exists(path) else None
+    return _pools[path]
+
+
+def shared_faker():
+    """Return this process's Faker, importing and building it on first use."""
+    global _faker
+    if _faker is None:
+        from faker import Faker
+        _faker = Faker()
+    return _faker
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate a pool of unique test users")
+    parser.add_argument("path")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--namespace", default=None)
+    args = parser.parse_args()
+    started = time.time()
+    DataGenerator(seed=args.seed).build_user_pool(args.path, args.count, args.namespace)
+    print(f"Wrote {args.count} users to {args.path} in {time.time() - started:.2f}s")
@@ -0,0 +1,77 @@
+from utils.arrival import correct_for_omission
+
+
+class Expectation:
+    """Declares what a response must contain to count as a success.
+
+    ``status`` is the required HTTP status; ``msg`` is an accepted ``msg``
+    value or a tuple of them; ``token`` is True when a token must be present,
+    False when it must be absent and None when it does not matter.
+    """
+
+    __slots__ = ("status", "messages", "token", "label")
+
+    def __init__(self, label, status=200, msg=None, token=None):
+        self.label = label
+        self.status = status
+        self.messages = (msg,) if isinstance(msg, str) else msg
+        self.token = token
+
+    def error(self, data):
+        """Return why parsed body ``data`` does not meet this expectation, or None."""
+        if self.token is True and "token" not in data:
+            return f"{self.label} failed: {data.get('msg')}"
+        if self.token is False and "token" in data:
+            return f"{self.label}: unexpected token in response"
+        if self.messages is not None and data.get("msg") not in self.messages:
+            return f"Unexpected response for {self.label}: {data}"
+        return None
+
+    def apply(self, response):
+        """Parse the body once and mark a ``catch_response`` response exactly once.
+
+        Returns the parsed body on success and None on failure.
+        """
+        if response.status_code != self.status:
+            response.failure(f"HTTP {response.status_code}")
+            return None
+        try:
+            data = response.json()
+        except ValueError as e:
+            response.failure(f"Failed to parse response: {str(e)}")
+            return None
+        error = self.error(data) if isinstance(data, dict) else f"Unexpected response for {self.label}: {data}"
+        if error:
+            response.failure(error)
+            return None
+        response.success()
+        return data
+
+
+class AnyOf(Expectation):
+    """Succeeds when any one of several expectations is met."""
+
+    __slots__ = ("options",)
+
+    def __init__(self, label, *options, status=200):
+        super().__init__(label, status=status)
+        self.options = options
+
+    def error(self, data):
+        if any(option.error(data) is None for option in self.options):
+            return None
+        return f"Unexpected response for {self.label}: {data}"
+
+
+def post_expecting(client, path, data, expectation, headers=None, name=None, intended_start=None, **kwargs):
+    """POST through a Locust client and record the outcome once, under ``name`` if given.
+
+    ``name`` replaces the URL as the stats entry, which gives a per-case
+    sub-metric without firing a second request event for the same request.
+    With ``intended_start`` (open-model runs) the latency is measured from
+    the scheduled send time rather than the actual one.
+    """
+    with client.post(path, data=data, headers=headers, name=name, catch_response=True, **kwargs) as response:
+        if intended_start is not None:
+            correct_for_omission(response, intended_start)
+        return expectation.apply(response)
@@ -0,0 +1,28 @@
+import struct
+
+
+class RecordLayout:
+    """Packs dicts of short strings into fixed-width byte records.
+
+    Every field gets a fixed number of bytes (UTF-8, NUL padded), so record
+    ``i`` of a file or buffer always starts at ``i * layout.size``.
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self.names = [name for name, _ in self.fields]
+        self.struct = struct.Struct("<" + "".join(f"{width}s" for _, width in self.fields))
+        self.size = self.struct.size
+
+    def pack(self, record):
+        values = []
+        for name, width in self.fields:
+            value = str(record.get(name, "")).encode("utf-8")
+            if len(value) > width:
+                raise ValueError(f"Field {name!r} is longer than {width} bytes: {record.get(name)!r}")
+            values.append(value)
+        return self.struct.pack(*values)
+
+    def unpack_from(self, buffer, offset=0):
+        values = self.struct.unpack_from(buffer, offset)
+        return {name: value.rstrip(b"\0").decode("utf-8") for name, value in zip(self.names, values)}
@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import time
+
+FIELDS = ("fullName", "userName", "email", "password", "phone")
+
+
+class FixtureStore:
+    """SQLite store of users already registered on a target server, keyed by its base URL.
+
+    Scenarios that only need an existing account borrow users from here
+    instead of registering new ones. ``take`` hands out the least recently
+    used users first, so parallel workers and consecutive scenarios spread
+    their logins over the pool. SQLite's locking makes the file safe to share
+    between processes.
+    """
+
+    def __init__(self, path, environment):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.environment = environment
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "environment TEXT NOT NULL, fullName TEXT, userName TEXT NOT NULL, email TEXT NOT NULL, "
+            "password TEXT NOT NULL, phone TEXT, last_used REAL NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (environment, email))"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS users_lru ON users (environment, last_used)")
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM users WHERE environment = ?",
+                                       (self.environment,)).fetchone()[0]
+
+    def add(self, users):
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO users (environment, fullName, userName, email, password, phone) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(self.environment, *(user.get(field, "") for field in FIELDS)) for user in users],
+        )
+
+    def take(self, count):
+        """Return up to ``count`` distinct users, least recently used first, and mark them used."""
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            rows = self.connection.execute(
+                f"SELECT {', '.join(FIELDS)} FROM users WHERE environment = ? ORDER BY last_used LIMIT ?",
+                (self.environment, count),
+            ).fetchall()
+            self.connection.executemany(
+                "UPDATE users SET last_used = ? WHERE environment = ? AND email = ?",
+                [(time.time(), self.environment, row[2]) for row in rows],
+            )
+        return [dict(zip(FIELDS, row)) for row in rows]
+
+    def purge(self):
+        """Forget every user of this environment (e.g. after the server's database was reset)."""
+        self.connection.execute("DELETE FROM users WHERE environment = ?", (self.environment,))
+
+    def close(self):
+        self.connection.close()
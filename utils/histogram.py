@@ -0,0 +1,113 @@
+import base64
+import zlib
+from array import array
+
+SUB_BUCKET_BITS = 7
+# Values are stored as integer microseconds; anything above ~71 minutes is clamped
+MAX_VALUE_BITS = 32
+
+
+class LatencyHistogram:
+    """Fixed-memory log-linear (HDR-style) latency histogram.
+
+    Values below ``2**SUB_BUCKET_BITS`` microseconds get exact buckets. Above
+    that, every power of two is split into ``2**(SUB_BUCKET_BITS - 1)`` linear
+    sub-buckets, which bounds the relative error of any reported percentile to
+    about 1.6%. ``record`` is O(1), and memory is ~14 KB whatever the sample
+    count. Histograms from threads, processes or workers combine exactly with
+    ``merge`` and travel as compact dicts via ``to_dict``/``from_dict``.
+    """
+
+    sub_bucket_count = 1 << SUB_BUCKET_BITS
+    half_count = sub_bucket_count >> 1
+    bucket_count = sub_bucket_count + (MAX_VALUE_BITS - SUB_BUCKET_BITS) * half_count
+    max_value = (1 << MAX_VALUE_BITS) - 1
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * self.bucket_count))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return self.sub_bucket_count + (shift - 1) * self.half_count + (value >> shift) - self.half_count
+
+    def _bounds(self, index):
+        if index < self.sub_bucket_count:
+            return index, index
+        shift, offset = divmod(index - self.sub_bucket_count, self.half_count)
+        shift += 1
+        mantissa = offset + self.half_count
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value_ms, count=1):
+        """Record a latency in milliseconds."""
+        value = min(max(int(value_ms * 1000), 0), self.max_value)
+        self.counts[self._index(value)] += count
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """Return the latency in milliseconds at ``percent`` (0-100), or 0 when empty."""
+        if not self.count:
+            return 0
+        if percent >= 100:
+            return self.max / 1000
+        target = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= target:
+                low, high = self._bounds(index)
+                value = min(max((low + high) / 2, self.min), self.max)
+                return value / 1000
+        return self.max / 1000
+
+    def percentiles(self, percents=(50, 90, 99, 99.9)):
+        return {p: self.percentile(p) for p in percents}
+
+    def mean(self):
+        return self.total / self.count / 1000 if self.count else 0
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        counts = self.counts
+        for index, bucket in enumerate(other.counts):
+            if bucket:
+                counts[index] += bucket
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def to_dict(self):
+        return {
+            "sub_bucket_bits": SUB_BUCKET_BITS,
+            "count": self.count,
+            "total_us": self.total,
+            "min_us": self.min,
+            "max_us": self.max,
+            "counts": base64.b64encode(zlib.compress(self.counts.tobytes())).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data["sub_bucket_bits"] != SUB_BUCKET_BITS:
+            raise ValueError(f"Incompatible histogram precision: {data['sub_bucket_bits']} sub-bucket bits")
+        histogram = cls()
+        histogram.counts = array("Q", zlib.decompress(base64.b64decode(data["counts"])))
+        histogram.count = data["count"]
+        histogram.total = data["total_us"]
+        histogram.min = data["min_us"]
+        histogram.max = data["max_us"]
+        return histogram
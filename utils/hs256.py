@@ -0,0 +1,44 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+_HEADER = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data):
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def encode(payload, secret):
+    """Return an HS256 JWT for ``payload``, compatible with ``jwt.decode(..., algorithms=['HS256'])``."""
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    signing_input = _HEADER + b"." + body
+    signature = hmac.new(secret.encode(), signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64encode(signature)).decode("ascii")
+
+
+def decode(token, secret, verify_exp=True):
+    """Verify an HS256 JWT and return its claims; raise ValueError when it is malformed, forged or expired."""
+    try:
+        header, body, signature = token.encode("ascii").split(b".")
+        claims = json.loads(_b64decode(body))
+        algorithm = json.loads(_b64decode(header)).get("alg")
+        signature = _b64decode(signature)
+    except (ValueError, UnicodeError, AttributeError) as e:
+        raise ValueError(f"Malformed token: {e}")
+    if algorithm != "HS256":
+        raise ValueError(f"Unexpected algorithm {algorithm}")
+    expected = hmac.new(secret.encode(), header + b"." + body, hashlib.sha256).digest()
+    if not hmac.compare_digest(signature, expected):
+        raise ValueError("Invalid signature")
+    if not isinstance(claims, dict):
+        raise ValueError("Malformed token: claims are not an object")
+    if verify_exp and "exp" in claims and claims["exp"] < time.time():
+        raise ValueError("Token expired")
+    return claims
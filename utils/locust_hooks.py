@@ -0,0 +1,10 @@
+"""Registers the run-wide Locust listeners; every locustfile imports this module once.
+
+Each listener is switched on and off by its own ``TestConfig`` setting.
+"""
+import utils.client_monitor  # noqa: F401  (flags runs where the load generator saturates)
+import utils.metrics_exporter  # noqa: F401  (live metrics when TestConfig.METRICS_EXPORTER is set)
+import utils.replay  # noqa: F401  (records a replay capture when TestConfig.REPLAY_RECORD is set)
+import utils.sample_log  # noqa: F401  (raw sample log when TestConfig.SAMPLE_LOG is set)
+import utils.slo_watchdog  # noqa: F401  (registers the SLO watchdog)
+import utils.warmup  # noqa: F401  (splits ramp and steady-state stats when TestConfig.STEADY_STATE_SPLIT is set)
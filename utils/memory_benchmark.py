@@ -0,0 +1,91 @@
+import argparse
+import gc
+import json
+import os
+import sys
+
+import gevent
+import psutil
+from gevent.event import Event
+from locust.env import Environment
+
+from config.test_config import TestConfig
+from utils.spawn_benchmark import load_user_class
+
+
+def per_user_kb(points):
+    """Least-squares slope of RSS (bytes) over user count, in KB per user."""
+    n = len(points)
+    mean_users = sum(users for users, _ in points) / n
+    mean_rss = sum(rss for _, rss in points) / n
+    spread = sum((users - mean_users) ** 2 for users, _ in points)
+    if not spread:
+        return 0.0
+    return sum((users - mean_users) * (rss - mean_rss) for users, rss in points) / spread / 1024
+
+
+def benchmark(locustfile, users, step, host, user_class=None, settle=2.0):
+    """Run ``users`` users of ``locustfile`` in this process, adding ``step`` at a time.
+
+    After each step the users run for ``settle`` seconds, so sessions,
+    connections and greenlet stacks exist, and then RSS is sampled after a
+    full garbage collection. The per-user cost is the slope of RSS over the
+    user count, which leaves out the fixed cost of the interpreter and
+    imports.
+    """
+    cls, _ = load_user_class(locustfile, user_class)
+    environment = Environment(user_classes=[cls], host=host)
+    runner = environment.create_local_runner()
+    process = psutil.Process()
+    spawned = Event()
+    environment.events.spawning_complete.add_listener(lambda user_count, **kw: spawned.set())
+
+    gc.collect()
+    points = [(0, process.memory_info().rss)]
+    for count in range(step, users + step, step):
+        count = min(count, users)
+        spawned.clear()
+        runner.start(count, spawn_rate=step)
+        spawned.wait(120)
+        gevent.sleep(settle)
+        gc.collect()
+        points.append((runner.user_count, process.memory_info().rss))
+        print(f"{runner.user_count:>7} users  {points[-1][1] / 2**20:8.1f} MB RSS", file=sys.stderr)
+    runner.quit()
+    return {
+        "locustfile": locustfile,
+        "user_class": cls.__name__,
+        "users": users,
+        "shared_connections": TestConfig.SHARED_CONNECTIONS,
+        "per_user_kb": round(per_user_kb(points), 2),
+        "rss_mb": [(count, round(rss / 2**20, 1)) for count, rss in points],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure RSS per simulated user and check it against the budget")
+    parser.add_argument("locustfile")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--step", type=int, default=1000)
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds the users run before each RSS sample")
+    parser.add_argument("--user-class", default=None)
+    parser.add_argument("--host", default=TestConfig.BASE_URL.rstrip("/"))
+    parser.add_argument("--budget-kb", type=float, default=TestConfig.USER_MEMORY_BUDGET_KB)
+    parser.add_argument("--shared-connections", action="store_true",
+                        help="Share one connection pool per process (TestConfig.SHARED_CONNECTIONS)")
+    parser.add_argument("--output", default=os.path.join(TestConfig.REPORTS_DIR, "memory_benchmark.json"))
+    args = parser.parse_args()
+    if args.shared_connections:
+        # The user classes pick their pools when the locustfile is imported
+        TestConfig.SHARED_CONNECTIONS = True
+    result = benchmark(args.locustfile, args.users, args.step, args.host, args.user_class, args.settle)
+    result["budget_kb"] = args.budget_kb
+    result["within_budget"] = result["per_user_kb"] <= args.budget_kb
+    print(json.dumps(result, indent=4))
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=4)
+    if not result["within_budget"]:
+        print(f"{result['user_class']} uses {result['per_user_kb']} KB per user, over the "
+              f"{args.budget_kb} KB budget", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,257 @@
+import argparse
+import logging
+import re
+import socket
+import time
+
+import gevent
+from gevent.pywsgi import WSGIServer
+from locust import events
+from locust.event import EventHook
+from locust.runners import MasterRunner
+
+from config.test_config import TestConfig
+from utils.histogram import LatencyHistogram
+from utils.worker import worker_index
+
+QUANTILES = (50, 90, 95, 99, 99.9)
+# Keeps StatsD datagrams under a typical MTU
+MAX_DATAGRAM = 1400
+
+
+class EndpointMetrics:
+    """Cumulative counters and latency histogram of one ``(request_type, name)`` endpoint.
+
+    ``rate``, ``new_requests`` and ``new_failures`` cover the interval up to
+    the last :meth:`MetricsRegistry.tick`.
+    """
+
+    __slots__ = ("requests", "failures", "bytes", "histogram", "rate", "new_requests", "new_failures",
+                 "ticked_requests", "ticked_failures")
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.bytes = 0
+        self.histogram = LatencyHistogram()
+        self.rate = 0.0
+        self.new_requests = 0
+        self.new_failures = 0
+        self.ticked_requests = 0
+        self.ticked_failures = 0
+
+
+class MetricsRegistry:
+    """Live per-endpoint request metrics of one Locust process, fed by ``events.request``.
+
+    Each process only sees its own requests, and they are all recorded from
+    its gevent hub, so the counters are plain integers with no lock. ``record``
+    costs one dict lookup, a few additions and a histogram update;
+    percentiles are only computed when the metrics are read.
+    """
+
+    def __init__(self, worker=None):
+        self.worker = str(worker_index() if worker is None else worker)
+        self.endpoints = {}
+        self.last_tick = time.monotonic()
+
+    def record(self, request_type, name, response_time, response_length, exception=None, **kwargs):
+        metrics = self.endpoints.get((request_type, name))
+        if metrics is None:
+            metrics = self.endpoints[(request_type, name)] = EndpointMetrics()
+        metrics.requests += 1
+        if exception is not None:
+            metrics.failures += 1
+        metrics.bytes += response_length or 0
+        metrics.histogram.record(response_time or 0)
+
+    def tick(self):
+        """Close the current interval: update every endpoint's rate and new request/failure counts."""
+        now = time.monotonic()
+        elapsed = max(now - self.last_tick, 1e-9)
+        self.last_tick = now
+        for metrics in self.endpoints.values():
+            metrics.new_requests = metrics.requests - metrics.ticked_requests
+            metrics.new_failures = metrics.failures - metrics.ticked_failures
+            metrics.ticked_requests = metrics.requests
+            metrics.ticked_failures = metrics.failures
+            metrics.rate = metrics.new_requests / elapsed
+
+    def prometheus(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        prefix = TestConfig.METRICS_PREFIX
+        families = {
+            "requests_total": ("counter", "Requests sent"),
+            "failures_total": ("counter", "Requests that failed"),
+            "response_bytes_total": ("counter", "Response bytes received"),
+            "requests_per_second": ("gauge", f"Request rate over the last {TestConfig.METRICS_INTERVAL}s"),
+            "response_time_seconds": ("summary", "Response time quantiles since the start of the run"),
+        }
+        samples = {family: [] for family in families}
+        for (request_type, name), metrics in sorted(self.endpoints.items()):
+            labels = f'worker="{self.worker}",method="{_label(request_type)}",name="{_label(name)}"'
+            samples["requests_total"].append(f"{prefix}_requests_total{{{labels}}} {metrics.requests}")
+            samples["failures_total"].append(f"{prefix}_failures_total{{{labels}}} {metrics.failures}")
+            samples["response_bytes_total"].append(f"{prefix}_response_bytes_total{{{labels}}} {metrics.bytes}")
+            samples["requests_per_second"].append(f"{prefix}_requests_per_second{{{labels}}} {metrics.rate:.3f}")
+            summary = samples["response_time_seconds"]
+            for quantile, value in metrics.histogram.percentiles(QUANTILES).items():
+                summary.append(f'{prefix}_response_time_seconds{{{labels},quantile="{quantile / 100:g}"}} '
+                               f"{value / 1000:.6f}")
+            summary.append(f"{prefix}_response_time_seconds_sum{{{labels}}} {metrics.histogram.total / 1e6:.6f}")
+            summary.append(f"{prefix}_response_time_seconds_count{{{labels}}} {metrics.histogram.count}")
+        lines = []
+        for family, (kind, help_text) in families.items():
+            lines.append(f"# HELP {prefix}_{family} {help_text}")
+            lines.append(f"# TYPE {prefix}_{family} {kind}")
+            lines.extend(samples[family])
+        return "\n".join(lines) + "\n"
+
+    def statsd_lines(self):
+        """StatsD lines for the last interval: request/failure counters plus rate and percentile gauges (ms)."""
+        lines = []
+        for (request_type, name), metrics in self.endpoints.items():
+            key = f"{TestConfig.METRICS_PREFIX}.worker{self.worker}.{_bucket(request_type)}.{_bucket(name)}"
+            lines.append(f"{key}.requests:{metrics.new_requests}|c")
+            lines.append(f"{key}.failures:{metrics.new_failures}|c")
+            lines.append(f"{key}.rps:{metrics.rate:.3f}|g")
+            for quantile, value in metrics.histogram.percentiles(QUANTILES).items():
+                suffix = f"p{quantile:g}".replace(".", "_")
+                lines.append(f"{key}.{suffix}:{value:.3f}|g")
+        return lines
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _bucket(value):
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", str(value)).strip("_") or "root"
+
+
+class MetricsExporter:
+    """Publishes a :class:`MetricsRegistry` every ``TestConfig.METRICS_INTERVAL`` seconds.
+
+    ``mode`` "prometheus" serves the registry on
+    ``METRICS_HOST:METRICS_PORT + worker index`` for scraping; "statsd" sends
+    it as UDP datagrams to ``STATSD_HOST:STATSD_PORT``. Neither blocks a
+    user: the HTTP server and the push loop are greenlets of their own.
+    """
+
+    def __init__(self, registry, mode=TestConfig.METRICS_EXPORTER):
+        if mode not in ("prometheus", "statsd"):
+            raise ValueError(f"Unknown metrics exporter: {mode!r}")
+        self.registry = registry
+        self.mode = mode
+        self.server = None
+        self.socket = None
+        self.greenlet = gevent.spawn(self.run)
+        if mode == "prometheus":
+            port = TestConfig.METRICS_PORT + int(registry.worker)
+            self.server = WSGIServer((TestConfig.METRICS_HOST, port), self.serve, log=None)
+            self.server.start()
+            logging.info(f"Serving Prometheus metrics on http://{TestConfig.METRICS_HOST}:{port}/metrics")
+        else:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.address = (TestConfig.STATSD_HOST, TestConfig.STATSD_PORT)
+
+    def run(self):
+        while True:
+            gevent.sleep(TestConfig.METRICS_INTERVAL)
+            self.registry.tick()
+            if self.socket is not None:
+                self.push()
+
+    def serve(self, environ, start_response):
+        if environ["PATH_INFO"] not in ("/", "/metrics"):
+            start_response("404 Not Found", [("Content-Type", "text/plain")])
+            return [b"Not found\n"]
+        body = self.registry.prometheus().encode()
+        start_response("200 OK", [("Content-Type", "text/plain; version=0.0.4; charset=utf-8"),
+                                  ("Content-Length", str(len(body)))])
+        return [body]
+
+    def push(self):
+        datagram = []
+        size = 0
+        for line in self.registry.statsd_lines():
+            if datagram and size + len(line) + 1 > MAX_DATAGRAM:
+                self.send("\n".join(datagram))
+                datagram, size = [], 0
+            datagram.append(line)
+            size += len(line) + 1
+        if datagram:
+            self.send("\n".join(datagram))
+
+    def send(self, payload):
+        try:
+            self.socket.sendto(payload.encode(), self.address)
+        except OSError as e:
+            logging.warning(f"StatsD push to {self.address[0]}:{self.address[1]} failed: {e}")
+
+    def close(self):
+        self.greenlet.kill(block=False)
+        if self.server is not None:
+            self.server.stop(timeout=1)
+        if self.socket is not None:
+            self.registry.tick()
+            self.push()
+            self.socket.close()
+
+
+_exporter = None
+
+
+@events.init.add_listener
+def start_exporter(environment, **kwargs):
+    global _exporter
+    if not TestConfig.METRICS_EXPORTER or _exporter is not None or isinstance(environment.runner, MasterRunner):
+        return
+    registry = MetricsRegistry()
+    environment.events.request.add_listener(registry.record)
+    _exporter = MetricsExporter(registry, TestConfig.METRICS_EXPORTER)
+
+
+@events.quitting.add_listener
+def stop_exporter(environment, **kwargs):
+    global _exporter
+    if _exporter is not None:
+        _exporter.close()
+        _exporter = None
+
+
+def benchmark(count, endpoints):
+    """Return the mean cost in microseconds of ``record`` alone and of a full ``events.request`` fire."""
+    registry = MetricsRegistry(worker=0)
+    names = [f"/endpoint_{i}" for i in range(endpoints)]
+    latencies = [(i * 7919) % 5000 / 10 for i in range(count)]
+
+    start = time.perf_counter()
+    for i in range(count):
+        registry.record("POST", names[i % endpoints], latencies[i], 120)
+    direct = (time.perf_counter() - start) / count * 1e6
+
+    request_event = EventHook()
+    request_event.add_listener(registry.record)
+    start = time.perf_counter()
+    for i in range(count):
+        request_event.fire(request_type="POST", name=names[i % endpoints], response_time=latencies[i],
+                           response_length=120, response=None, context={}, exception=None)
+    fired = (time.perf_counter() - start) / count * 1e6
+
+    start = time.perf_counter()
+    registry.tick()
+    rendered = registry.prometheus()
+    render_ms = (time.perf_counter() - start) * 1000
+    return direct, fired, render_ms, len(rendered)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the per-request cost of the live metrics exporter")
+    parser.add_argument("--requests", type=int, default=1_000_000)
+    parser.add_argument("--endpoints", type=int, default=10)
+    args = parser.parse_args()
+    direct, fired, render_ms, size = benchmark(args.requests, args.endpoints)
+    print(f"record(): {direct:.2f} us/request")
+    print(f"events.request.fire() with the listener: {fired:.2f} us/request")
+    print(f"Prometheus page for {args.endpoints} endpoints: {render_ms:.1f} ms, {size} bytes")
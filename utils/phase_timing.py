@@ -0,0 +1,208 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import socket
+import time
+
+from gevent.local import local
+from locust import events
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config.test_config import TestConfig
+from utils.histogram import LatencyHistogram
+from utils.worker import worker_index
+
+REQUEST_ID_HEADER = "X-Request-ID"
+PHASES = ("dns", "connect", "tls", "write", "ttfb", "download")
+SLOWEST_KEPT = 5
+
+_current = local()
+_request_ids = itertools.count()
+
+
+def _phases():
+    phases = getattr(_current, "phases", None)
+    if phases is None:
+        phases = _current.phases = {}
+    return phases
+
+
+class _TimedConnection:
+    """Times the phases of one request on a urllib3 connection into the greenlet's phase dict.
+
+    Resolution happens here rather than inside ``create_connection`` so DNS
+    and TCP connect are measured separately; reused keep-alive connections
+    skip both.
+    """
+
+    def _new_conn(self):
+        phases = _phases()
+        start = time.perf_counter()
+        try:
+            address = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except socket.gaierror:
+            address = None  # let urllib3 raise its usual NameResolutionError
+        resolved = time.perf_counter()
+        phases["dns"] = (resolved - start) * 1000
+        host, self._dns_host = self._dns_host, address or self._dns_host
+        try:
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = host
+        phases["connect"] = (time.perf_counter() - resolved) * 1000
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        self._connect_ms = (time.perf_counter() - start) * 1000
+        if isinstance(self, HTTPSConnection):
+            phases = _phases()
+            phases["tls"] = self._connect_ms - phases.get("dns", 0) - phases.get("connect", 0)
+
+    def request(self, *args, **kwargs):
+        # urllib3 connects lazily inside request(); that part is not write time
+        self._connect_ms = 0
+        start = time.perf_counter()
+        super().request(*args, **kwargs)
+        self._sent = time.perf_counter()
+        _phases()["write"] = (self._sent - start) * 1000 - self._connect_ms
+
+    def getresponse(self):
+        response = super().getresponse()
+        _phases()["ttfb"] = (time.perf_counter() - self._sent) * 1000
+        return response
+
+
+class TimedHTTPConnection(_TimedConnection, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnection, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PhaseTimingAdapter(HTTPAdapter):
+    """Transport adapter that tags each request with an ``X-Request-ID`` and times its phases.
+
+    The response gets ``phases`` (ms per phase; ``dns``/``connect``/``tls``
+    only when a new connection was opened) and ``request_id``, which the
+    request event listener below aggregates per endpoint.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool,
+                                                   "https": TimedHTTPSConnectionPool}
+
+    def send(self, request, stream=False, **kwargs):
+        request_id = f"{os.getpid()}-{next(_request_ids)}"
+        request.headers[REQUEST_ID_HEADER] = request_id
+        _current.phases = phases = {}
+        response = super().send(request, stream=stream, **kwargs)
+        if not stream:
+            start = time.perf_counter()
+            response.content  # read the body here so the download is timed on its own
+            phases["download"] = (time.perf_counter() - start) * 1000
+        response.phases = phases
+        response.request_id = request_id
+        return response
+
+
+_shared_adapter = None
+
+
+def instrument(session):
+    """Route a requests/Locust ``HttpSession`` through ``PhaseTimingAdapter``.
+
+    With ``TestConfig.SHARED_CONNECTIONS`` every session gets the same
+    adapter, so the timed connections are pooled per process like the
+    untimed ones (see ``utils.connection_pool``).
+    """
+    global _shared_adapter
+    if TestConfig.SHARED_CONNECTIONS:
+        if _shared_adapter is None:
+            _shared_adapter = PhaseTimingAdapter(pool_maxsize=TestConfig.CONNECTION_POOL_SIZE)
+        adapter = _shared_adapter
+    else:
+        adapter = PhaseTimingAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class PhaseStats:
+    """Per-endpoint histogram for each phase, plus the slowest request ids for log lookups."""
+
+    def __init__(self):
+        self.endpoints = {}
+
+    def record(self, name, response_time, request_id, phases):
+        endpoint = self.endpoints.get(name)
+        if endpoint is None:
+            endpoint = self.endpoints[name] = {"phases": {phase: LatencyHistogram() for phase in PHASES},
+                                               "new_connections": 0, "slowest": []}
+        for phase, value in phases.items():
+            endpoint["phases"][phase].record(value)
+        if "connect" in phases:
+            endpoint["new_connections"] += 1
+        sample = (response_time, request_id, phases)
+        if len(endpoint["slowest"]) < SLOWEST_KEPT:
+            heapq.heappush(endpoint["slowest"], sample)
+        elif response_time > endpoint["slowest"][0][0]:
+            heapq.heapreplace(endpoint["slowest"], sample)
+
+    def report(self):
+        return {
+            name: {
+                "new_connections": endpoint["new_connections"],
+                "phases_ms": {
+                    phase: {"count": histogram.count, "mean": round(histogram.mean(), 3),
+                            **{f"p{p:g}": value for p, value in histogram.percentiles((50, 90, 99)).items()},
+                            "max": histogram.percentile(100)}
+                    for phase, histogram in endpoint["phases"].items() if histogram.count
+                },
+                "slowest": [
+                    {"request_id": request_id, "response_time": round(response_time, 3),
+                     "phases_ms": {phase: round(value, 3) for phase, value in phases.items()}}
+                    for response_time, request_id, phases in sorted(endpoint["slowest"], reverse=True)
+                ],
+            }
+            for name, endpoint in self.endpoints.items()
+        }
+
+
+phase_stats = PhaseStats()
+
+
+@events.request.add_listener
+def record_phases(name, response_time, response=None, **kwargs):
+    phases = getattr(response, "phases", None)
+    if phases is not None:
+        phase_stats.record(name, response_time, response.request_id, phases)
+
+
+@events.test_stop.add_listener
+def write_phase_report(environment, **kwargs):
+    if not phase_stats.endpoints:
+        return
+    report = phase_stats.report()
+    for name, endpoint in report.items():
+        logging.info(f"Phase timing for {name}: " + ", ".join(
+            f"{phase} p99 {stats['p99']:.1f} ms" for phase, stats in endpoint["phases_ms"].items()))
+    os.makedirs(TestConfig.REPORTS_DIR, exist_ok=True)
+    path = os.path.join(TestConfig.REPORTS_DIR, f"phase_timing_{worker_index()}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=4)
@@ -0,0 +1,117 @@
+import glob
+import heapq
+import json
+import os
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from locust import events
+from locust.runners import MasterRunner
+
+from config.test_config import TestConfig
+from utils.worker import worker_count, worker_index
+
+
+def capture_files(path=None):
+    """The capture at ``path``, or the per-worker ``<root>_<i><ext>`` files recorded in its place."""
+    path = path or TestConfig.REPLAY_CAPTURE_PATH
+    if os.path.exists(path):
+        return [path]
+    root, ext = os.path.splitext(path)
+    files = sorted(glob.glob(f"{glob.escape(root)}_[0-9]*{ext}"))
+    if not files:
+        raise FileNotFoundError(f"No capture at {path} or {root}_<worker>{ext}")
+    return files
+
+
+def _entries(path):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_capture(path, index=0, count=1):
+    """Yield this worker's share of a JSONL capture, one entry at a time.
+
+    Entries are ``{"t", "method", "path", "name", "data"}``, where ``t`` is
+    the time the request was sent, in seconds since the epoch; each file is
+    sorted by ``t``. Per-worker captures (see :func:`capture_path`) are merged
+    by ``t`` as they are read, so they replay as one run. Yielded entries
+    have ``t`` rebased to seconds from the first request of the capture.
+    Entry ``n`` of the merged stream belongs to worker ``n % count``, so
+    every worker streams the same files without loading them and each
+    request is replayed exactly once.
+    """
+    start = None
+    merged = heapq.merge(*(_entries(file) for file in capture_files(path)), key=lambda entry: entry["t"])
+    for number, entry in enumerate(merged):
+        if start is None:
+            start = entry["t"]
+        if number % count == index:
+            entry["t"] = round(entry["t"] - start, 6)
+            yield entry
+
+
+def capture_path(path=None):
+    """Per-worker capture file when several workers record at once."""
+    path = path or TestConfig.REPLAY_CAPTURE_PATH
+    if worker_count() == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{worker_index()}{ext}"
+
+
+class CaptureRecorder:
+    """Writes every request a run makes (as seen by Locust's request event) to a JSONL capture.
+
+    Requests are logged as they complete, which is not the order they were
+    sent in, so lines go to ``<path>.part`` first and are sorted by their
+    send time into ``path`` when the recorder closes.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.file = open(f"{path}.part", "w")
+        self.started = False
+
+    def start(self):
+        self.started = True
+
+    def on_request(self, name, response=None, start_time=None, **kwargs):
+        request = getattr(response, "request", None)
+        if request is None or not self.started:
+            return
+        body = request.body or ""
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", "replace")
+        self.file.write(json.dumps({
+            "t": round(start_time or time.time(), 6),
+            "method": request.method,
+            "path": urlsplit(request.url).path,
+            "name": name,
+            "data": dict(parse_qsl(body, keep_blank_values=True)),
+        }) + "\n")
+
+    def close(self):
+        self.file.close()
+        with open(self.file.name) as f:
+            lines = [line for line in f if line.strip()]
+        lines.sort(key=lambda line: json.loads(line)["t"])
+        with open(self.path, "w") as f:
+            f.writelines(lines)
+        os.remove(self.file.name)
+
+
+@events.init.add_listener
+def install_recorder(environment, **kwargs):
+    if not TestConfig.REPLAY_RECORD or isinstance(environment.runner, MasterRunner):
+        return
+    # A replay run would overwrite the capture it is replaying
+    if not all(getattr(user_class, "record_replay", True) for user_class in environment.user_classes):
+        return
+    recorder = CaptureRecorder(capture_path())
+    environment.events.test_start.add_listener(lambda **kw: recorder.start())
+    environment.events.request.add_listener(recorder.on_request)
+    environment.events.quitting.add_listener(lambda **kw: recorder.close())
@@ -1,41 +1,122 @@
 import json
 import os
+import time
 from datetime import datetime
 
+from utils.histogram import LatencyHistogram
+
+OPERATIONS = ["registration", "login"]
+REPORT_PERCENTILES = (50, 90, 99, 99.9)
+# Past this many throughput buckets per operation the interval is doubled and neighbouring buckets are summed
+MAX_THROUGHPUT_BUCKETS = 3600
+
 
 class ResultsHandler:
-    def __init__(self):
-        self.results = {
-            "registration": {"successful": 0, "failed": 0, "times": []},
-            "login": {"successful": 0, "failed": 0, "times": []}
-        }
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.start_time = time.time()
+        self.results = {operation: self._empty_result() for operation in OPERATIONS}
+
+    @staticmethod
+    def _empty_result():
+        # "throughput" maps interval index (since start_time) -> completed requests
+        return {"successful": 0, "failed": 0, "histogram": LatencyHistogram(), "throughput": {}}
 
     def update_results(self, operation, success, response_time):
+        result = self.results[operation]
         if success:
-            self.results[operation]["successful"] += 1
+            result["successful"] += 1
         else:
-            self.results[operation]["failed"] += 1
-        self.results[operation]["times"].append(response_time)
+            result["failed"] += 1
+        result["histogram"].record(response_time * 1000)
+        bucket = int((time.time() - self.start_time) // self.interval)
+        result["throughput"][bucket] = result["throughput"].get(bucket, 0) + 1
+        if len(result["throughput"]) > MAX_THROUGHPUT_BUCKETS:
+            self._coarsen()
+
+    def _coarsen(self):
+        """Double the throughput interval, so a long run keeps whole-run coverage in bounded memory."""
+        self.interval *= 2
+        for result in self.results.values():
+            throughput = {}
+            for bucket, count in result["throughput"].items():
+                throughput[bucket // 2] = throughput.get(bucket // 2, 0) + count
+            result["throughput"] = throughput
+
+    def merge(self, other):
+        """Fold another handler's results (another thread, process or worker) into this one."""
+        while self.interval < other.interval:
+            self._coarsen()
+        offset = other.start_time - self.start_time
+        for operation, theirs in other.results.items():
+            ours = self.results.setdefault(operation, self._empty_result())
+            ours["successful"] += theirs["successful"]
+            ours["failed"] += theirs["failed"]
+            ours["histogram"].merge(theirs["histogram"])
+            for bucket, count in theirs["throughput"].items():
+                # Their bucket goes to whichever of ours holds its midpoint
+                bucket = int((offset + (bucket + 0.5) * other.interval) // self.interval)
+                ours["throughput"][bucket] = ours["throughput"].get(bucket, 0) + count
+        while max(len(result["throughput"]) for result in self.results.values()) > MAX_THROUGHPUT_BUCKETS:
+            self._coarsen()
+        return self
+
+    def to_dict(self):
+        return {
+            "interval": self.interval,
+            "start_time": self.start_time,
+            "results": {
+                operation: {
+                    "successful": result["successful"],
+                    "failed": result["failed"],
+                    "histogram": result["histogram"].to_dict(),
+                    "throughput": {str(bucket): count for bucket, count in result["throughput"].items()},
+                }
+                for operation, result in self.results.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        handler = cls(interval=data["interval"])
+        handler.start_time = data["start_time"]
+        for operation, result in data["results"].items():
+            handler.results[operation] = {
+                "successful": result["successful"],
+                "failed": result["failed"],
+                "histogram": LatencyHistogram.from_dict(result["histogram"]),
+                "throughput": {int(bucket): count for bucket, count in result["throughput"].items()},
+            }
+        return handler
 
     def generate_report(self, config):
         report = {
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "test_configuration": {
-                "concurrent_users": config.CONCURRENT_USERS,
-                "total_iterations": config.ITERATIONS
+                "concurrent_users": config.CONCURRENT_USERS
             }
         }
 
-        for operation in ["registration", "login"]:
-            total = self.results[operation]["successful"] + self.results[operation]["failed"]
-            avg_time = sum(self.results[operation]["times"]) / len(self.results[operation]["times"]) if \
-            self.results[operation]["times"] else 0
+        for operation, result in self.results.items():
+            total = result["successful"] + result["failed"]
+            histogram = result["histogram"]
 
             report[f"{operation}_results"] = {
-                "successful": self.results[operation]["successful"],
-                "failed": self.results[operation]["failed"],
-                "average_response_time": f"{avg_time:.3f} seconds",
-                "success_rate": f"{(self.results[operation]['successful'] / total * 100):.2f}%" if total > 0 else "0%"
+                "successful": result["successful"],
+                "failed": result["failed"],
+                "average_response_time": f"{histogram.mean() / 1000:.3f} seconds",
+                "response_time_percentiles": {
+                    f"p{p:g}": f"{histogram.percentile(p) / 1000:.3f} seconds" for p in REPORT_PERCENTILES
+                },
+                "max_response_time": f"{histogram.percentile(100) / 1000:.3f} seconds",
+                "throughput": [
+                    {
+                        "interval_start": f"{bucket * self.interval:g}s",
+                        "requests_per_second": round(count / self.interval, 3),
+                    }
+                    for bucket, count in sorted(result["throughput"].items())
+                ],
+                "success_rate": f"{(result['successful'] / total * 100):.2f}%" if total > 0 else "0%"
             }
 
         report_path = os.path.join("reports", f"load_test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
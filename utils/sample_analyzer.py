@@ -0,0 +1,131 @@
+"""Post-run analysis of the raw sample logs written by ``utils.sample_log``.
+
+    python -m utils.sample_analyzer reports/samples --bucket 1 --heatmap reports/latency_heatmap.csv
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from utils.sample_log import SAMPLE_FORMAT
+
+SAMPLE_DTYPE = np.dtype([("timestamp", "<f8"), ("endpoint", "<u2"), ("latency", "<f4"),
+                         ("status", "<u2"), ("bytes", "<u4"), ("failed", "u1")])
+# Upper bounds (ms) of the heatmap's latency bands; the last band is open-ended
+LATENCY_BANDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def load_samples(paths):
+    """Memory-map every sample log and return ``(samples, endpoint_names)``.
+
+    Endpoint ids are per file; they are remapped onto one shared list of names
+    so logs from several workers can be analysed together.
+    """
+    names = []
+    parts = []
+    for path in paths:
+        with open(f"{path}.json") as f:
+            index = json.load(f)
+        if index["format"] != SAMPLE_FORMAT:
+            raise ValueError(f"{path}: unsupported sample format {index['format']}")
+        if not os.path.getsize(path):
+            continue
+        samples = np.memmap(path, dtype=SAMPLE_DTYPE, mode="r")
+        remap = np.empty(len(index["endpoints"]), dtype=np.uint16)
+        for endpoint_id, name in enumerate(index["endpoints"]):
+            if name not in names:
+                names.append(name)
+            remap[endpoint_id] = names.index(name)
+        if not np.array_equal(remap, np.arange(len(remap))):
+            samples = np.array(samples)  # copy out of the read-only map before renumbering
+            samples["endpoint"] = remap[samples["endpoint"]]
+        parts.append(samples)
+    if not parts:
+        return np.empty(0, dtype=SAMPLE_DTYPE), names
+    return (parts[0] if len(parts) == 1 else np.concatenate(parts)), names
+
+
+def summarize(latency, failed, duration):
+    values = np.percentile(latency, PERCENTILES) if len(latency) else [0] * len(PERCENTILES)
+    return {
+        "requests": int(len(latency)),
+        "failures": int(np.count_nonzero(failed)),
+        "requests_per_second": round(len(latency) / duration, 2) if duration else 0,
+        "mean_ms": round(float(latency.mean()), 3) if len(latency) else 0,
+        **{f"p{p:g}_ms": round(float(v), 3) for p, v in zip(PERCENTILES, values)},
+        "max_ms": round(float(latency.max()), 3) if len(latency) else 0,
+    }
+
+
+def endpoint_breakdown(samples, names):
+    """Per-endpoint percentiles from one stable (radix) sort by endpoint id instead of a mask per endpoint."""
+    duration = float(samples["timestamp"].max() - samples["timestamp"].min()) if len(samples) else 0
+    order = np.argsort(samples["endpoint"], kind="stable")
+    endpoints = samples["endpoint"][order]
+    latency = samples["latency"][order]
+    status = samples["status"][order]
+    failed = samples["failed"][order]
+    bounds = np.searchsorted(endpoints, np.arange(len(names) + 1))
+    breakdown = {}
+    for endpoint_id, name in enumerate(names):
+        start, end = bounds[endpoint_id], bounds[endpoint_id + 1]
+        if start == end:
+            continue
+        codes, counts = np.unique(status[start:end], return_counts=True)
+        breakdown[name] = {
+            **summarize(latency[start:end], failed[start:end], duration),
+            "status_codes": {str(code): int(count) for code, count in zip(codes, counts)},
+        }
+    return {"total": summarize(latency, failed, duration), "endpoints": breakdown}
+
+
+def latency_heatmap(samples, bucket_seconds=1.0, bands=LATENCY_BANDS):
+    """Count samples per (time bucket, latency band) with a single ``bincount``."""
+    if not len(samples):
+        return np.zeros((0, len(bands) + 1), dtype=np.int64), 0.0
+    started = float(samples["timestamp"].min())
+    buckets = ((samples["timestamp"] - started) // bucket_seconds).astype(np.int64)
+    band = np.searchsorted(np.asarray(bands, dtype=np.float32), samples["latency"], side="left")
+    width = len(bands) + 1
+    counts = np.bincount(buckets * width + band, minlength=(int(buckets.max()) + 1) * width)
+    return counts.reshape(-1, width), started
+
+
+def write_heatmap(path, heatmap, started, bucket_seconds, bands=LATENCY_BANDS):
+    labels = [f"<={b}ms" for b in bands] + [f">{bands[-1]}ms"]
+    with open(path, "w") as f:
+        f.write(",".join(["bucket_start"] + labels) + "\n")
+        for row, counts in enumerate(heatmap):
+            f.write(f"{started + row * bucket_seconds:.3f}," + ",".join(map(str, counts)) + "\n")
+
+
+def sample_paths(target):
+    if os.path.isdir(target):
+        return sorted(glob.glob(os.path.join(target, "*.bin")))
+    return [target]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse raw Locust sample logs")
+    parser.add_argument("target", help="A sample log or a directory of them")
+    parser.add_argument("--bucket", type=float, default=1.0, help="Heatmap time bucket in seconds")
+    parser.add_argument("--heatmap", default=None, help="Write the time x latency heatmap to this CSV")
+    parser.add_argument("--output", default=None, help="Write the JSON summary here instead of stdout")
+    args = parser.parse_args()
+
+    started = time.time()
+    samples, names = load_samples(sample_paths(args.target))
+    report = endpoint_breakdown(samples, names)
+    if args.heatmap:
+        heatmap, first = latency_heatmap(samples, args.bucket)
+        write_heatmap(args.heatmap, heatmap, first, args.bucket)
+    report["analysis_seconds"] = round(time.time() - started, 2)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
@@ -0,0 +1,105 @@
+import json
+import os
+import struct
+import time
+
+from locust import events
+from locust.runners import MasterRunner
+
+from config.test_config import TestConfig
+from utils.worker import worker_index
+
+# timestamp (epoch s), endpoint id, latency (ms), HTTP status (0 = no response), response bytes,
+# failed (Locust's verdict, which also covers failed checks on a 200 response)
+SAMPLE_FORMAT = "<dHfHIB"
+SAMPLE_SIZE = struct.calcsize(SAMPLE_FORMAT)
+BUFFERED_SAMPLES = 4096
+
+
+class SampleLog:
+    """Append-only file of fixed-width request samples, written in bulk.
+
+    Samples are packed into a preallocated buffer and written
+    ``BUFFERED_SAMPLES`` at a time, so recording a request is one
+    ``pack_into`` and no system call. Endpoint names are stored once in
+    ``<path>.json``, where each record's endpoint id indexes the list. Read the
+    file back with ``utils.sample_analyzer``.
+    """
+
+    def __init__(self, path, buffered=BUFFERED_SAMPLES):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.file = open(path, "ab")
+        self.buffer = bytearray(SAMPLE_SIZE * buffered)
+        self.capacity = buffered
+        self.pending = 0
+        self.endpoints = {}
+        index_path = f"{path}.json"
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                self.endpoints = {name: i for i, name in enumerate(json.load(f)["endpoints"])}
+
+    def endpoint_id(self, name):
+        endpoint_id = self.endpoints.get(name)
+        if endpoint_id is None:
+            endpoint_id = self.endpoints[name] = len(self.endpoints)
+            self.write_index()
+        return endpoint_id
+
+    def record(self, timestamp, endpoint, latency_ms, status, size, failed):
+        struct.pack_into(SAMPLE_FORMAT, self.buffer, self.pending * SAMPLE_SIZE,
+                         timestamp, self.endpoint_id(endpoint), latency_ms, status, min(size, 0xFFFFFFFF), failed)
+        self.pending += 1
+        if self.pending == self.capacity:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.file.write(memoryview(self.buffer)[:self.pending * SAMPLE_SIZE])
+            self.file.flush()
+            self.pending = 0
+
+    def write_index(self):
+        with open(f"{self.path}.json", "w") as f:
+            json.dump({"format": SAMPLE_FORMAT, "endpoints": list(self.endpoints)}, f, indent=4)
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+_sample_log = None
+
+
+@events.init.add_listener
+def open_sample_log(environment, **kwargs):
+    global _sample_log
+    if TestConfig.SAMPLE_LOG and _sample_log is None and not isinstance(environment.runner, MasterRunner):
+        path = os.path.join(TestConfig.SAMPLE_LOG_DIR, f"samples_{worker_index()}_{os.getpid()}.bin")
+        _sample_log = SampleLog(path)
+
+
+@events.request.add_listener
+def record_sample(request_type, name, response_time, response_length, response=None, exception=None,
+                  start_time=None, **kwargs):
+    if _sample_log is None:
+        return
+    if start_time is None:
+        start_time = time.time() - (response_time or 0) / 1000
+    status = getattr(response, "status_code", 0) or 0
+    _sample_log.record(start_time, f"{request_type} {name}", response_time or 0, status,
+                       response_length or 0, exception is not None)
+
+
+@events.test_stop.add_listener
+def flush_sample_log(environment, **kwargs):
+    if _sample_log is not None:
+        _sample_log.flush()
+
+
+@events.quitting.add_listener
+def close_sample_log(environment, **kwargs):
+    global _sample_log
+    if _sample_log is not None:
+        _sample_log.close()
+        _sample_log = None
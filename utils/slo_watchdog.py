@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import time
+
+import gevent
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+from config.test_config import TestConfig
+from utils.histogram import LatencyHistogram
+
+BREACH_MESSAGE = "slo_breach"
+
+
+class SloWindow:
+    """Sliding window of per-second latency histograms and error counts.
+
+    ``record`` only touches the current second's slot, so it is O(1) whatever
+    the request rate; percentiles over the window are computed once per
+    second by ``evaluate``.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.slots = [(LatencyHistogram(), [0]) for _ in range(seconds)]
+        self.current = 0
+
+    def record(self, response_time, failed):
+        histogram, errors = self.slots[self.current]
+        histogram.record(response_time)
+        if failed:
+            errors[0] += 1
+
+    def rotate(self):
+        self.current = (self.current + 1) % self.seconds
+        self.slots[self.current] = (LatencyHistogram(), [0])
+
+    def evaluate(self):
+        """Return ``(requests, p95_ms, p99_ms, success_rate)`` over the whole window."""
+        window = LatencyHistogram()
+        errors = 0
+        for histogram, slot_errors in self.slots:
+            window.merge(histogram)
+            errors += slot_errors[0]
+        if not window.count:
+            return 0, 0, 0, 100.0
+        return (window.count, window.percentile(95), window.percentile(99),
+                (window.count - errors) / window.count * 100)
+
+
+class SloWatchdog:
+    """Stops the run once the SLOs have been breached for ``breach_seconds`` in a row.
+
+    Every second the sliding window is checked against
+    ``TestConfig.MAX_RESPONSE_TIME`` (p95) and
+    ``TestConfig.SUCCESS_RATE_THRESHOLD``. On a breach the reason is written
+    to ``reports/slo_breach.json`` and Locust exits with
+    ``TestConfig.SLO_EXIT_CODE``. Workers report the breach to the master,
+    which stops the whole run.
+    """
+
+    def __init__(self, environment, window=TestConfig.SLO_WINDOW, breach_seconds=TestConfig.SLO_BREACH_SECONDS):
+        self.environment = environment
+        self.window = SloWindow(window)
+        self.breach_seconds = breach_seconds
+        self.consecutive = 0
+        self.greenlet = None
+
+    def on_request(self, response_time, exception, **kwargs):
+        self.window.record(response_time or 0, exception is not None)
+
+    def start(self):
+        if self.greenlet is None:
+            self.greenlet = gevent.spawn(self.run)
+
+    def stop(self):
+        if self.greenlet is not None:
+            self.greenlet.kill(block=False)
+            self.greenlet = None
+
+    def run(self):
+        next_check = time.monotonic() + 1
+        while True:
+            gevent.sleep(max(0.0, next_check - time.monotonic()))
+            next_check += 1
+            reason = self.check()
+            self.window.rotate()
+            if reason:
+                self.breached(reason)
+                return
+
+    def check(self):
+        requests, p95, p99, success_rate = self.window.evaluate()
+        if requests < TestConfig.SLO_MIN_REQUESTS:
+            self.consecutive = 0
+            return None
+        problems = []
+        if p95 > TestConfig.MAX_RESPONSE_TIME:
+            problems.append(f"p95 {p95:.0f} ms > {TestConfig.MAX_RESPONSE_TIME} ms")
+        if success_rate < TestConfig.SUCCESS_RATE_THRESHOLD:
+            problems.append(f"success rate {success_rate:.1f}% < {TestConfig.SUCCESS_RATE_THRESHOLD}%")
+        self.consecutive = self.consecutive + 1 if problems else 0
+        if self.consecutive < self.breach_seconds:
+            return None
+        return {
+            "reason": f"{', '.join(problems)} for {self.consecutive}s",
+            "window_seconds": self.window.seconds,
+            "requests": requests,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "success_rate": round(success_rate, 2),
+        }
+
+    def breached(self, reason):
+        runner = self.environment.runner
+        if isinstance(runner, WorkerRunner):
+            runner.send_message(BREACH_MESSAGE, reason)
+        else:
+            abort_run(self.environment, reason)
+
+
+def abort_run(environment, reason):
+    if environment.process_exit_code == TestConfig.SLO_EXIT_CODE:
+        return  # another worker already reported a breach
+    logging.error(f"SLO watchdog stopping the run: {reason['reason']}")
+    os.makedirs(TestConfig.REPORTS_DIR, exist_ok=True)
+    with open(os.path.join(TestConfig.REPORTS_DIR, "slo_breach.json"), "w") as f:
+        json.dump(reason, f, indent=4)
+    environment.process_exit_code = TestConfig.SLO_EXIT_CODE
+    # quit() kills the runner's greenlets, so it must not run inside one of them
+    gevent.spawn(environment.runner.quit)
+
+
+@events.init.add_listener
+def install_watchdog(environment, **kwargs):
+    if not TestConfig.SLO_WATCHDOG or not getattr(environment.shape_class, "slo_watchdog", True):
+        return
+    if isinstance(environment.runner, MasterRunner):
+        environment.runner.register_message(BREACH_MESSAGE, lambda environment, msg, **kw: abort_run(environment,
+                                                                                                     msg.data))
+        return
+    watchdog = SloWatchdog(environment)
+    environment.events.request.add_listener(watchdog.on_request)
+    environment.events.test_start.add_listener(lambda **kw: watchdog.start())
+    environment.events.test_stop.add_listener(lambda **kw: watchdog.stop())
@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import time
+
+from gevent.event import Event
+from locust.env import Environment
+from locust.main import load_locustfile
+
+from config.test_config import TestConfig
+
+
+def load_user_class(locustfile, user_class=None):
+    """Import ``locustfile`` and return ``(user class, import seconds)``; ``user_class`` picks one by name."""
+    started = time.perf_counter()
+    _, user_classes, _ = load_locustfile(locustfile)
+    import_s = time.perf_counter() - started
+    if user_class is None:
+        if len(user_classes) != 1:
+            raise ValueError(f"{locustfile} defines {', '.join(user_classes)}; pick one with --user-class")
+        user_class = next(iter(user_classes))
+    return user_classes[user_class], import_s
+
+
+def benchmark(locustfile, users, host, user_class=None, timeout=120):
+    """Import ``locustfile`` and start ``users`` of its user class at once in this process.
+
+    Reports the import time, the time until Locust had created and scheduled
+    every user, the time until the first request completed and the time
+    until every user had finished ``on_start`` (the ramp stall caused by
+    per-user setup).
+    """
+    base, import_s = load_user_class(locustfile, user_class)
+    spawned = Event()
+    first_request = Event()
+    all_started = Event()
+    marks = {}
+    on_start_done = [0]
+
+    def on_start(self):
+        base.on_start(self)
+        on_start_done[0] += 1
+        if on_start_done[0] == users:
+            marks["all_started"] = time.perf_counter()
+            all_started.set()
+
+    timed = type(base.__name__, (base,), {"on_start": on_start, "__module__": base.__module__})
+    environment = Environment(user_classes=[timed], host=host)
+    runner = environment.create_local_runner()
+
+    def on_spawned(user_count, **kwargs):
+        marks["spawned"] = time.perf_counter()
+        spawned.set()
+
+    def on_request(**kwargs):
+        if "first_request" not in marks:
+            marks["first_request"] = time.perf_counter()
+            first_request.set()
+
+    environment.events.spawning_complete.add_listener(on_spawned)
+    environment.events.request.add_listener(on_request)
+    start = time.perf_counter()
+    runner.start(users, spawn_rate=users)
+    for event in (spawned, all_started, first_request):
+        event.wait(timeout)
+    runner.quit()
+
+    def since_start(mark):
+        return round(marks[mark] - start, 4) if mark in marks else None
+
+    return {
+        "locustfile": locustfile,
+        "user_class": base.__name__,
+        "users": users,
+        "import_s": round(import_s, 4),
+        "spawn_s": since_start("spawned"),
+        "all_users_started_s": since_start("all_started"),
+        "first_request_s": since_start("first_request"),
+        "spawn_us_per_user": round((marks["spawned"] - start) / users * 1e6, 1) if "spawned" in marks else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time one Locust process importing a locustfile, spawning N users and sending first requests"
+    )
+    parser.add_argument("locustfile")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--user-class", default=None)
+    parser.add_argument("--host", default=TestConfig.BASE_URL.rstrip("/"))
+    parser.add_argument("--output", default=os.path.join(TestConfig.REPORTS_DIR, "spawn_benchmark.json"))
+    args = parser.parse_args()
+    result = benchmark(args.locustfile, args.users, args.host, args.user_class)
+    print(json.dumps(result, indent=4))
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=4)
@@ -0,0 +1,39 @@
+import statistics
+from collections import deque
+
+
+class SteadyStateDetector:
+    """Detects when throughput and latency have settled.
+
+    Fed one ``(throughput, latency_ms)`` sample per interval, it reports
+    steady once the last ``window`` samples each vary by at most ``max_cv``
+    (coefficient of variation). Latency may also move by up to
+    ``latency_tolerance_ms`` in absolute terms, so a 1-2 ms service does not
+    look unstable from timer noise alone.
+    """
+
+    def __init__(self, window=10, max_cv=0.1, latency_tolerance_ms=5):
+        self.window = window
+        self.max_cv = max_cv
+        self.latency_tolerance_ms = latency_tolerance_ms
+        self.throughput = deque(maxlen=window)
+        self.latency = deque(maxlen=window)
+
+    def add(self, throughput, latency_ms):
+        self.throughput.append(throughput)
+        self.latency.append(latency_ms)
+
+    def reset(self):
+        self.throughput.clear()
+        self.latency.clear()
+
+    def is_steady(self):
+        if len(self.throughput) < self.window:
+            return False
+        throughput_mean = statistics.fmean(self.throughput)
+        if throughput_mean <= 0:
+            return False
+        if statistics.pstdev(self.throughput) > self.max_cv * throughput_mean:
+            return False
+        latency_limit = max(self.max_cv * statistics.fmean(self.latency), self.latency_tolerance_ms)
+        return statistics.pstdev(self.latency) <= latency_limit
@@ -0,0 +1,191 @@
+"""Offline stand-in for the Flask app under test.
+
+Serves /client_registeration and /client_login with the same responses the
+behave steps and Locust scenarios assert on, from an in-memory user index on
+a single asyncio event loop (uvloop when installed). Latency and error
+injection make it possible to benchmark the load generator itself:
+
+    python -m utils.stub_server --port 5000 --latency-ms 20 --jitter-ms 10 --error-rate 0.01
+
+``--wait-ready SECONDS`` does not serve: it waits until a server accepts
+connections on the port, so scripts can start the stub in the background
+and block until it is up.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import socket
+import sys
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from config.test_config import TestConfig
+from utils import hs256
+
+NAME_RE = re.compile(r"[A-Za-z][A-Za-z .'-]{0,99}")
+USERNAME_RE = re.compile(r"[A-Za-z0-9_.-]{1,64}")
+EMAIL_RE = re.compile(r"[A-Za-z0-9_.+-]{1,64}@[A-Za-z0-9-]+(\.[A-Za-z0-9-]+)+")
+PHONE_RE = re.compile(r"[0-9+()x. -]{7,25}")
+TOKEN_LIFETIME = 3600  # seconds
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class StubApp:
+    def __init__(self, secret=TestConfig.JWT_SECRET, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=None):
+        self.secret = secret
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.users_by_email = {}
+        self.users_by_name = {}
+        self.routes = {
+            TestConfig.REGISTRATION_ENDPOINT: self.register,
+            TestConfig.LOGIN_ENDPOINT: self.login,
+        }
+
+    @staticmethod
+    def is_valid(form):
+        return bool(
+            NAME_RE.fullmatch(form.get("fullName", ""))
+            and USERNAME_RE.fullmatch(form.get("userName", ""))
+            and len(form.get("email", "")) <= 120 and EMAIL_RE.fullmatch(form.get("email", ""))
+            and 0 < len(form.get("password", "")) <= 64
+            and PHONE_RE.fullmatch(form.get("phone", ""))
+        )
+
+    def register(self, form):
+        if not self.is_valid(form):
+            return 200, {"msg": "Invalid Data"}
+        email = form["email"].lower()
+        if email in self.users_by_email:
+            return 200, {"msg": "Email already Exist"}
+        user = {"email": form["email"], "userName": form["userName"], "password": form["password"]}
+        self.users_by_email[email] = user
+        self.users_by_name.setdefault(form["userName"], user)
+        return 200, {"msg": "User Registered"}
+
+    def login(self, form):
+        if form.get("email"):
+            user = self.users_by_email.get(form["email"].lower())
+            rejected = "In correct email or password"
+        else:
+            user = self.users_by_name.get(form.get("userName", ""))
+            rejected = "In correct username or password"
+        if user is None or user["password"] != form.get("password"):
+            return 200, {"msg": rejected}
+        token = hs256.encode(
+            {"email": user["email"], "userName": user["userName"], "exp": int(time.time()) + TOKEN_LIFETIME},
+            self.secret,
+        )
+        return 200, {"token": token}
+
+    async def dispatch(self, method, target, headers, body):
+        if self.latency_ms or self.jitter_ms:
+            await asyncio.sleep((self.latency_ms + self.random.uniform(0, self.jitter_ms)) / 1000)
+        if self.error_rate and self.random.random() < self.error_rate:
+            return 500, {"msg": "Injected error"}
+
+        handler = self.routes.get(urlsplit(target).path.rstrip("/") or "/")
+        if handler is None:
+            return 404, {"msg": "Not Found"}
+        if method != "POST":
+            return 405, {"msg": "Method Not Allowed"}
+        try:
+            if headers.get("content-type", "").startswith("application/json"):
+                form = {key: str(value) for key, value in json.loads(body or b"{}").items()}
+            else:
+                form = dict(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+        except (ValueError, AttributeError):
+            return 400, {"msg": "Invalid Data"}
+        return handler(form)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+
+                status, payload = await self.dispatch(method, target, headers, body)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                content = json.dumps(payload).encode()
+                writer.write(
+                    f"{version} {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(app, host, port):
+    server = await asyncio.start_server(app.handle_connection, host, port, backlog=4096, reuse_address=True)
+    print(f"Stub server listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def wait_until_ready(host, port, timeout):
+    """Poll ``host:port`` until it accepts a TCP connection; False if ``timeout`` seconds pass first."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return True
+        except OSError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Flask app under test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random delay on top of --latency-ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--wait-ready", type=float, default=None, metavar="SECONDS",
+                        help="Wait for a server on --host/--port to accept connections instead of serving")
+    args = parser.parse_args()
+    if args.wait_ready is not None:
+        if not wait_until_ready(args.host, args.port, args.wait_ready):
+            print(f"No server on {args.host}:{args.port} after {args.wait_ready:g}s", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    app = StubApp(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=args.seed)
+    try:
+        asyncio.run(serve(app, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
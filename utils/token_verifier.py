@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+from collections import OrderedDict
+
+import gevent
+from gevent.queue import Empty, Full, Queue
+from locust import events
+from locust.runners import MasterRunner
+
+from config.test_config import TestConfig
+from utils import hs256
+from utils.worker import worker_index
+
+# Seconds stop() waits to queue the end marker and again for the pending tokens to be verified
+STOP_TIMEOUT = 10
+
+
+class TokenVerifier:
+    """Checks login tokens in the background so a task only pays for one queue put.
+
+    ``submit`` puts ``(token, expected claims, name)`` on a bounded queue and
+    never blocks: when the queue is full the token is counted as dropped. One
+    greenlet drains the queue in batches and decodes each batch in gevent's
+    OS thread pool, so signature checks never run on a user's greenlet. The
+    pool thread only decodes; the LRU cache of recently seen tokens and the
+    counters are only touched on the hub. Any token that fails
+    verification or names the wrong user is reported as a ``JWT`` failure
+    under ``<name> token``, separate from the login request's own stats.
+    """
+
+    def __init__(self, environment, secret=TestConfig.JWT_SECRET, queue_size=TestConfig.TOKEN_VERIFY_QUEUE,
+                 batch_size=TestConfig.TOKEN_VERIFY_BATCH, cache_size=TestConfig.TOKEN_CACHE_SIZE):
+        self.environment = environment
+        self.secret = secret
+        self.queue = Queue(queue_size)
+        self.batch_size = batch_size
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.counts = {"submitted": 0, "verified": 0, "mismatched": 0, "dropped": 0, "cache_hits": 0}
+        self.greenlet = None
+        self.finished = False
+
+    def submit(self, token, expected, name):
+        try:
+            self.queue.put_nowait((token, expected, name))
+        except Full:
+            self.counts["dropped"] += 1
+            return False
+        self.counts["submitted"] += 1
+        return True
+
+    def start(self):
+        if self.greenlet is None:
+            self.finished = False
+            self.greenlet = gevent.spawn(self.run)
+
+    def run(self):
+        while not self.finished:
+            self.process(self.queue.get())
+
+    def process(self, item):
+        """Verify ``item`` plus whatever else is queued, up to one batch; None marks the end of the run."""
+        batch = []
+        while True:
+            if item is None:
+                self.finished = True
+                break
+            batch.append(item)
+            if len(batch) == self.batch_size:
+                break
+            try:
+                item = self.queue.get_nowait()
+            except Empty:
+                break
+        if not batch:
+            return
+        claims = {}
+        for token, _, _ in batch:
+            if token in self.cache:
+                self.cache.move_to_end(token)
+                claims[token] = self.cache[token]
+                self.counts["cache_hits"] += 1
+        new_tokens = list({token for token, _, _ in batch if token not in claims})
+        if new_tokens:
+            decoded = gevent.get_hub().threadpool.apply(decode_tokens, (new_tokens, self.secret))
+            for token, result in zip(new_tokens, decoded):
+                claims[token] = self.cache[token] = result
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        for token, expected, name in batch:
+            error = check_claims(claims[token], expected)
+            self.counts["verified"] += 1
+            if error:
+                self.counts["mismatched"] += 1
+                self.environment.events.request.fire(
+                    request_type="JWT",
+                    name=f"{name} token",
+                    response_time=0,
+                    response_length=0,
+                    exception=AssertionError(error),
+                    context={},
+                )
+
+    def stop(self):
+        if self.greenlet is not None:
+            try:
+                # Queued behind every pending token, so all of them are verified
+                self.queue.put(None, timeout=STOP_TIMEOUT)
+                self.greenlet.join(timeout=STOP_TIMEOUT)
+            except Full:
+                pass
+            if not self.greenlet.dead:
+                logging.warning(f"Token verification did not finish within {STOP_TIMEOUT}s; "
+                                "unverified tokens are counted as dropped")
+                self.greenlet.kill()
+                self.counts["dropped"] += self.queue.qsize()
+            self.greenlet = None
+        if self.counts["submitted"] or self.counts["dropped"]:
+            os.makedirs(TestConfig.REPORTS_DIR, exist_ok=True)
+            with open(os.path.join(TestConfig.REPORTS_DIR, f"token_verification_{worker_index()}.json"), "w") as f:
+                json.dump(self.counts, f, indent=4)
+            logging.info(f"Token verification: {self.counts}")
+
+
+def decode_tokens(tokens, secret):
+    """Runs in a pool thread and touches no shared state: the claims of each token, or the ValueError it raised."""
+    results = []
+    for token in tokens:
+        try:
+            results.append(hs256.decode(token, secret))
+        except ValueError as e:
+            results.append(e)
+    return results
+
+
+def check_claims(claims, expected):
+    """The reason ``claims`` (or a decode error) fail ``expected``, or None if they match."""
+    if isinstance(claims, ValueError):
+        return str(claims)
+    wrong = [key for key, value in expected.items() if value and claims.get(key) != value]
+    return f"Token issued for the wrong {'/'.join(wrong)}: {claims}" if wrong else None
+
+
+_verifier = None
+
+
+def verify_token(token, expected, name):
+    """Queue a login token for background verification when ``TestConfig.TOKEN_VERIFICATION`` is on.
+
+    ``expected`` maps claim names (``email``, ``userName``) to the values the
+    token must carry; empty values are not checked.
+    """
+    if _verifier is not None:
+        _verifier.submit(token, expected, name)
+
+
+@events.init.add_listener
+def install_verifier(environment, **kwargs):
+    global _verifier
+    if not TestConfig.TOKEN_VERIFICATION or isinstance(environment.runner, MasterRunner):
+        return
+    _verifier = TokenVerifier(environment)
+    environment.events.test_start.add_listener(lambda **kw: _verifier.start())
+    environment.events.test_stop.add_listener(lambda **kw: _verifier.stop())
@@ -0,0 +1,128 @@
+import csv
+import json
+import logging
+import os
+import time
+
+import gevent
+from locust import events
+from locust.runners import STATE_RUNNING, WorkerRunner
+
+from config.test_config import TestConfig
+from utils.steady_state import SteadyStateDetector
+
+STATS_FIELDS = ["Type", "Name", "Request Count", "Failure Count", "Median Response Time",
+                "Average Response Time", "95%", "99%", "Max Response Time", "Requests/s", "Failures/s"]
+
+
+def stats_rows(stats):
+    """Per-endpoint rows plus the Aggregated row, in the layout of Locust's stats CSV."""
+    rows = []
+    for entry in sorted(stats.entries.values(), key=lambda e: (e.name, e.method)) + [stats.total]:
+        rows.append({
+            "Type": entry.method or "",
+            "Name": entry.name,
+            "Request Count": entry.num_requests,
+            "Failure Count": entry.num_failures,
+            "Median Response Time": entry.median_response_time,
+            "Average Response Time": round(entry.avg_response_time, 2),
+            "95%": entry.get_response_time_percentile(0.95),
+            "99%": entry.get_response_time_percentile(0.99),
+            "Max Response Time": entry.max_response_time,
+            "Requests/s": round(entry.total_rps, 2),
+            "Failures/s": round(entry.total_fail_per_sec, 2),
+        })
+    return rows
+
+
+class SteadyStateSplitter:
+    """Splits a run's statistics into a ramp section and a steady-state section.
+
+    Once all users are spawned and ``TestConfig.WARMUP_SECONDS`` have passed,
+    the aggregated throughput and p95 are fed to a ``SteadyStateDetector``
+    every second. When they settle (or ``STEADY_STATE_TIMEOUT`` runs out) the
+    stats so far are saved as the ramp section and Locust's stats are reset,
+    so its CSV/HTML reports only cover steady state. Both sections go to
+    ``reports/stats_phases.json`` and the ramp rows to ``<csv prefix>_ramp_stats.csv``.
+    """
+
+    def __init__(self, environment):
+        self.environment = environment
+        self.detector = SteadyStateDetector(window=TestConfig.STEADY_STATE_WINDOW)
+        self.greenlet = None
+        self.ramp = None
+
+    def start(self):
+        if self.greenlet is None:
+            self.ramp = None
+            self.greenlet = gevent.spawn(self.run)
+
+    def run(self):
+        started = time.time()
+        settled = None
+        while True:
+            gevent.sleep(1)
+            runner = self.environment.runner
+            if runner.state != STATE_RUNNING:
+                settled = None
+                self.detector.reset()
+                continue
+            if settled is None:
+                settled = time.time()
+            if time.time() - settled < TestConfig.WARMUP_SECONDS:
+                continue
+            total = runner.stats.total
+            self.detector.add(total.current_rps, total.get_current_response_time_percentile(0.95) or 0)
+            timed_out = time.time() - settled >= TestConfig.WARMUP_SECONDS + TestConfig.STEADY_STATE_TIMEOUT
+            if self.detector.is_steady() or timed_out:
+                self.split(started, steady=not timed_out)
+                return
+
+    def split(self, started, steady):
+        stats = self.environment.runner.stats
+        self.ramp = {
+            "duration": round(time.time() - started, 1),
+            "steady_state_detected": steady,
+            "stats": stats_rows(stats),
+        }
+        logging.info(f"Steady state {'reached' if steady else 'not detected'} after {self.ramp['duration']}s; "
+                     "resetting stats")
+        stats.reset_all()
+        self.write_ramp_csv()
+
+    def write_ramp_csv(self):
+        prefix = getattr(self.environment.parsed_options, "csv_prefix", None)
+        path = f"{prefix}_ramp_stats.csv" if prefix else os.path.join(TestConfig.REPORTS_DIR, "ramp_stats.csv")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=STATS_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.ramp["stats"])
+
+    def stop(self):
+        if self.greenlet is not None:
+            self.greenlet.kill(block=False)
+            self.greenlet = None
+        stats = self.environment.runner.stats
+        if self.ramp is None:
+            logging.warning("Run ended before steady state; the stats cover the ramp only")
+            phases = {"ramp": {"duration": None, "steady_state_detected": False, "stats": stats_rows(stats)},
+                      "steady_state": None}
+        else:
+            duration = (stats.last_request_timestamp or stats.start_time) - stats.start_time
+            phases = {"ramp": self.ramp, "steady_state": {"duration": round(duration, 1), "stats": stats_rows(stats)}}
+        os.makedirs(TestConfig.REPORTS_DIR, exist_ok=True)
+        with open(os.path.join(TestConfig.REPORTS_DIR, "stats_phases.json"), "w") as f:
+            json.dump(phases, f, indent=4)
+
+
+@events.init.add_listener
+def install_splitter(environment, **kwargs):
+    # Statistics are aggregated on the master (or the only process), never on workers
+    if isinstance(environment.runner, WorkerRunner) or not TestConfig.STEADY_STATE_SPLIT:
+        return
+    if not getattr(environment.shape_class, "steady_state_split", True):
+        return
+    splitter = SteadyStateSplitter(environment)
+    environment.events.test_start.add_listener(lambda **kw: splitter.start())
+    environment.events.test_stop.add_listener(lambda **kw: splitter.stop())
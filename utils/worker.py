@@ -0,0 +1,15 @@
+import os
+
+# Set by behave_runner.run_locust on every worker process it starts
+WORKER_INDEX_ENV = "LOCUST_WORKER_INDEX"
+WORKER_COUNT_ENV = "LOCUST_WORKER_COUNT"
+
+
+def worker_index():
+    """Index of this Locust process among the workers on this node (0 when standalone)."""
+    return int(os.environ.get(WORKER_INDEX_ENV, 0))
+
+
+def worker_count():
+    """Number of Locust worker processes on this node (1 when standalone)."""
+    return max(int(os.environ.get(WORKER_COUNT_ENV, 1)), 1)